@@ -0,0 +1,214 @@
+# Filename: address_roi.py
+
+import logging
+import os
+
+import cv2
+import numpy as np
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# "detector": EasyOCR's text detector, recognition only on the address block's boxes
+# "contours": morphological line detection, full OCR on the address block crop
+# "off": recognize the whole frame
+ROI_MODE = os.environ.get("OCR_ROI_MODE", "detector")
+ROI_MODES = ("detector", "contours", "off")
+
+# Width the contour detector works at
+ROI_ANALYSIS_WIDTH = 800
+
+# Lines join a block when the vertical gap is below this many line heights
+LINE_GAP = 1.2
+
+# Fewer lines than this is a stamp, logo or stray label rather than an address
+MIN_BLOCK_LINES = 2
+
+# Padding around the contour crop, as a fraction of its size
+ROI_PADDING = 0.05
+
+# -------------------------------
+# Block Grouping
+# -------------------------------
+
+def group_boxes(boxes, line_gap=LINE_GAP):
+    """Group (x0, y0, x1, y1) text boxes into blocks of nearby lines.
+
+    Two boxes belong together when they overlap horizontally (within a
+    line height) and the vertical gap between them is under `line_gap`
+    line heights. Returns lists of indexes into `boxes`.
+    """
+    if not boxes:
+        return []
+    rects = np.asarray(boxes, dtype=np.float32)
+    heights = np.maximum(rects[:, 3] - rects[:, 1], 1.0)
+    line_height = float(np.median(heights))
+    slack = line_height * line_gap
+
+    # Pairwise adjacency, vectorized over all boxes
+    x_gap = np.maximum(rects[:, None, 0], rects[None, :, 0]) - np.minimum(rects[:, None, 2], rects[None, :, 2])
+    y_gap = np.maximum(rects[:, None, 1], rects[None, :, 1]) - np.minimum(rects[:, None, 3], rects[None, :, 3])
+    adjacent = (x_gap < line_height) & (y_gap < slack)
+
+    parent = list(range(len(boxes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(adjacent, 1))):
+        parent[find(i)] = find(j)
+    blocks = {}
+    for i in range(len(boxes)):
+        blocks.setdefault(find(i), []).append(i)
+    return list(blocks.values())
+
+
+def count_lines(boxes, indexes):
+    """Distinct text lines among the given boxes (boxes whose vertical centres are a line apart)."""
+    centres = sorted((boxes[i][1] + boxes[i][3]) / 2.0 for i in indexes)
+    heights = [boxes[i][3] - boxes[i][1] for i in indexes]
+    half_line = max(float(np.median(heights)) / 2.0, 1.0)
+    lines = 1
+    for previous, current in zip(centres, centres[1:]):
+        if current - previous > half_line:
+            lines += 1
+    return lines
+
+
+def select_address_block(boxes, line_gap=LINE_GAP, min_lines=MIN_BLOCK_LINES):
+    """Indexes of the boxes making up the most address-like block, or None.
+
+    Addresses are several short lines of similar size; stamps, logos and
+    slogans are one or two lines. Blocks are ranked by line count, then
+    by area.
+    """
+    best, best_score = None, None
+    for block in group_boxes(boxes, line_gap):
+        lines = count_lines(boxes, block)
+        if lines < min_lines:
+            continue
+        x0 = min(boxes[i][0] for i in block)
+        y0 = min(boxes[i][1] for i in block)
+        x1 = max(boxes[i][2] for i in block)
+        y1 = max(boxes[i][3] for i in block)
+        score = (lines, (x1 - x0) * (y1 - y0))
+        if best_score is None or score > best_score:
+            best, best_score = block, score
+    return best
+
+
+def line_boxes(image, analysis_width=ROI_ANALYSIS_WIDTH):
+    """Text-line boxes found with a morphological gradient, Otsu threshold and horizontal closing."""
+    grey = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    height, width = grey.shape
+    scale = min(1.0, analysis_width / width)
+    if scale < 1.0:
+        grey = cv2.resize(grey, (analysis_width, int(height * scale)), interpolation=cv2.INTER_AREA)
+    gradient = cv2.morphologyEx(grey, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 1)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    small_height = grey.shape[0]
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # Text lines are wide and short; drop specks, borders and picture blobs
+        if w < 2 * h or h < 4 or h > small_height * 0.15:
+            continue
+        boxes.append((x / scale, y / scale, (x + w) / scale, (y + h) / scale))
+    return boxes
+
+# -------------------------------
+# Address Block Reader
+# -------------------------------
+
+def _bounds(points):
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class AddressBlockReader:
+    """Drop-in for easyocr.Reader.readtext that recognizes only the address block.
+
+    - "detector" runs EasyOCR's detector over the frame, groups its boxes
+      into blocks and runs recognition only on the address block's boxes;
+    - "contours" finds text lines with OpenCV, crops the address block and
+      runs the full reader on the crop (boxes are mapped back to the frame);
+    - "off" is plain readtext.
+    When no multi-line block is found the whole frame is recognized.
+    Other attributes are passed through to the wrapped reader.
+    """
+
+    def __init__(self, reader, mode=ROI_MODE):
+        if mode not in ROI_MODES:
+            raise ValueError(f"Unknown ROI mode {mode!r}; expected one of {ROI_MODES}.")
+        self.reader = reader
+        self.mode = mode
+        self.counters = {"frames": 0, "roi": 0, "full_frame": 0, "boxes_detected": 0, "boxes_recognized": 0}
+
+    def __getattr__(self, name):
+        return getattr(self.reader, name)
+
+    def readtext(self, image, **kwargs):
+        self.counters["frames"] += 1
+        if self.mode == "detector":
+            return self._read_detector(image, **kwargs)
+        if self.mode == "contours":
+            return self._read_contours(image, **kwargs)
+        self.counters["full_frame"] += 1
+        return self.reader.readtext(image, **kwargs)
+
+    def _read_detector(self, image, **kwargs):
+        horizontal, free = self.reader.detect(image)
+        horizontal, free = horizontal[0], free[0]
+        # horizontal boxes are [x_min, x_max, y_min, y_max]; free boxes are 4-point polygons
+        boxes = [(b[0], b[2], b[1], b[3]) for b in horizontal] + [_bounds(polygon) for polygon in free]
+        self.counters["boxes_detected"] += len(boxes)
+        block = select_address_block(boxes)
+        if block is None:
+            self.counters["full_frame"] += 1
+        else:
+            self.counters["roi"] += 1
+            chosen = set(block)
+            free = [box for i, box in enumerate(free, start=len(horizontal)) if i in chosen]
+            horizontal = [box for i, box in enumerate(horizontal) if i in chosen]
+        self.counters["boxes_recognized"] += len(horizontal) + len(free)
+        if not horizontal and not free:
+            return []
+        return self.reader.recognize(image, horizontal_list=horizontal, free_list=free, **kwargs)
+
+    def _read_contours(self, image, **kwargs):
+        boxes = line_boxes(image)
+        self.counters["boxes_detected"] += len(boxes)
+        block = select_address_block(boxes)
+        if block is None:
+            self.counters["full_frame"] += 1
+            return self.reader.readtext(image, **kwargs)
+        self.counters["roi"] += 1
+        self.counters["boxes_recognized"] += len(block)
+        x0, y0, x1, y1 = _bounds([boxes[i][:2] for i in block] + [boxes[i][2:] for i in block])
+        pad_x, pad_y = (x1 - x0) * ROI_PADDING, (y1 - y0) * ROI_PADDING
+        height, width = image.shape[:2]
+        left, top = max(0, int(x0 - pad_x)), max(0, int(y0 - pad_y))
+        right, bottom = min(width, int(x1 + pad_x) + 1), min(height, int(y1 + pad_y) + 1)
+        detections = self.reader.readtext(np.ascontiguousarray(image[top:bottom, left:right]), **kwargs)
+        return [([[x + left, y + top] for x, y in box], text, confidence) for box, text, confidence in detections]
+
+    def stats(self):
+        stats = dict(self.counters)
+        if stats["boxes_detected"]:
+            stats["recognized_fraction"] = round(stats["boxes_recognized"] / stats["boxes_detected"], 3)
+        return stats
+
+
+def log_roi_stats(reader):
+    """Log the ROI counters of a reader that is, or wraps, an AddressBlockReader."""
+    while reader is not None and not isinstance(reader, AddressBlockReader):
+        reader = vars(reader).get("reader")
+    if reader is not None:
+        logging.info(f"Address block ROI ({reader.mode}): {reader.stats()}")
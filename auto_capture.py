@@ -0,0 +1,117 @@
+# Filename: auto_capture.py
+
+import cv2
+import numpy as np
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Width frames are downscaled to before any metric is computed
+ANALYSIS_WIDTH = 320
+
+# Mean absolute grey-level difference (0-255) between consecutive frames below which the scene is still
+MOTION_THRESHOLD = 2.5
+
+# Consecutive still frames required before capturing
+STABLE_FRAMES = 5
+
+# Difference from the last captured frame that counts as a new envelope
+NEW_SCENE_THRESHOLD = 12.0
+
+# Variance of the Laplacian below which the frame is considered out of focus
+SHARPNESS_THRESHOLD = 60.0
+
+# Fraction of the frame covered by text-like blobs needed to bother running OCR
+TEXT_COVERAGE_THRESHOLD = 0.01
+
+# -------------------------------
+# Frame Gate
+# -------------------------------
+
+class FrameGate:
+    """Decides, per camera frame, whether full OCR is worth running.
+
+    Every metric runs on a downscaled greyscale copy:
+    - motion: mean absolute difference from the previous frame;
+    - new envelope: difference from the frame that was last captured;
+    - sharpness: variance of the Laplacian;
+    - text presence: area of blobs left after a morphological gradient,
+      Otsu threshold and horizontal closing (typical of printed lines).
+    A frame triggers OCR once it has been still for STABLE_FRAMES, is in
+    focus, shows text, and differs from the previous capture.
+    """
+
+    def __init__(self, analysis_width=ANALYSIS_WIDTH, motion_threshold=MOTION_THRESHOLD,
+                 stable_frames=STABLE_FRAMES, new_scene_threshold=NEW_SCENE_THRESHOLD,
+                 sharpness_threshold=SHARPNESS_THRESHOLD, text_coverage_threshold=TEXT_COVERAGE_THRESHOLD):
+        self.analysis_width = analysis_width
+        self.motion_threshold = motion_threshold
+        self.stable_frames = stable_frames
+        self.new_scene_threshold = new_scene_threshold
+        self.sharpness_threshold = sharpness_threshold
+        self.text_coverage_threshold = text_coverage_threshold
+        self._previous = None
+        self._last_captured = None
+        self._still_count = 0
+        self._gradient_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._line_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+        self.counters = {"frames": 0, "processed": 0, "moving": 0, "already_captured": 0,
+                         "blurry": 0, "no_text": 0}
+
+    def _small_grey(self, frame):
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        height, width = grey.shape
+        if width > self.analysis_width:
+            grey = cv2.resize(grey, (self.analysis_width, int(height * self.analysis_width / width)),
+                              interpolation=cv2.INTER_AREA)
+        return grey
+
+    @staticmethod
+    def difference(a, b):
+        return float(cv2.absdiff(a, b).mean())
+
+    @staticmethod
+    def sharpness(grey):
+        return float(cv2.Laplacian(grey, cv2.CV_64F).var())
+
+    def text_coverage(self, grey):
+        gradient = cv2.morphologyEx(grey, cv2.MORPH_GRADIENT, self._gradient_kernel)
+        _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, self._line_kernel)
+        return float(np.count_nonzero(lines)) / lines.size
+
+    def should_capture(self, frame):
+        """Feed one camera frame; True means run OCR on it now."""
+        self.counters["frames"] += 1
+        grey = self._small_grey(frame)
+        previous, self._previous = self._previous, grey
+
+        if previous is None or self.difference(grey, previous) > self.motion_threshold:
+            self._still_count = 0
+            self.counters["moving"] += 1
+            return False
+        self._still_count += 1
+        if self._still_count < self.stable_frames:
+            self.counters["moving"] += 1
+            return False
+
+        if self._last_captured is not None and \
+                self.difference(grey, self._last_captured) < self.new_scene_threshold:
+            self.counters["already_captured"] += 1
+            return False
+        if self.sharpness(grey) < self.sharpness_threshold:
+            self.counters["blurry"] += 1
+            return False
+        if self.text_coverage(grey) < self.text_coverage_threshold:
+            self.counters["no_text"] += 1
+            return False
+
+        self._last_captured = grey
+        self.counters["processed"] += 1
+        return True
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["skipped"] = stats["frames"] - stats["processed"]
+        return stats
@@ -0,0 +1,268 @@
+# Filename: batch_ocr.py
+#
+# Headless batch OCR: detection, translation, parsing and validation for
+# folders, globs and archives of scanned mail, with results written to
+# JSONL or CSV. Re-running with the same output file skips images that are
+# already done and retries the ones that failed (the retry's record is
+# appended after the failed one).
+#
+#   python batch_ocr.py scans/ "backlog/*.jpg" nightly.zip -o results.jsonl
+#   python batch_ocr.py scans/ -o results.jsonl --workers 8
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import tarfile
+import time
+import zipfile
+
+import cv2
+import numpy as np
+
+from ocr_pipeline import OcrPipeline, detections_to_text
+from ocr_workers import OcrWorkerPool
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff"}
+
+CSV_FIELDS = ["source", "pincode", "valid", "post_office", "region", "region_match",
+              "text", "translated", "parsed", "error", "detections", "ocr_seconds", "seconds"]
+
+# -------------------------------
+# Input Discovery
+# -------------------------------
+
+def _is_image(name):
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def iter_sources(inputs):
+    """Yield (source key, loader) for every image in the given paths, globs and archives.
+
+    Archive members are keyed as "archive.zip::member/path.jpg". Loaders
+    return the encoded image bytes, so skipped images are never read; an
+    archive loader must be called before the iterator is advanced.
+    """
+    for item in inputs:
+        paths = sorted(glob.glob(item)) if glob.has_magic(item) else [item]
+        for path in paths:
+            if not os.path.exists(path):
+                logging.warning(f"Skipping {path}: no such file or directory.")
+            elif os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    for name in sorted(files):
+                        if _is_image(name):
+                            full = os.path.join(root, name)
+                            yield full, (lambda full=full: open(full, "rb").read())
+            elif zipfile.is_zipfile(path):
+                with zipfile.ZipFile(path) as archive:
+                    for name in sorted(archive.namelist()):
+                        if _is_image(name):
+                            yield f"{path}::{name}", (lambda archive=archive, name=name: archive.read(name))
+            elif tarfile.is_tarfile(path):
+                with tarfile.open(path) as archive:
+                    for member in sorted(archive.getmembers(), key=lambda m: m.name):
+                        if member.isfile() and _is_image(member.name):
+                            yield (f"{path}::{member.name}",
+                                   (lambda archive=archive, member=member: archive.extractfile(member).read()))
+            elif _is_image(path):
+                yield path, (lambda path=path: open(path, "rb").read())
+            else:
+                logging.warning(f"Skipping {path}: not an image, directory or archive.")
+
+
+def decode_image(data):
+    """Decode encoded image bytes to an RGB array (None if undecodable)."""
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+# -------------------------------
+# Output and Resume
+# -------------------------------
+
+def source_key(source):
+    """Resume key of a source: its real absolute path, so "./scans/a.jpg" and "scans/a.jpg" match."""
+    path, separator, member = source.partition("::")
+    return os.path.realpath(path) + separator + member
+
+
+def completed_sources(output_path):
+    """Resume keys (see source_key) of the sources with a successful result in an existing output file.
+
+    Records carrying an error (network, translation, a crashed OCR worker)
+    are not counted, so the next run retries those images.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    done = set()
+    with open(output_path, newline="", encoding="utf-8") as f:
+        for record in _read_records(f, output_path.endswith(".csv")):
+            if isinstance(record, dict) and record.get("source") and not record.get("error"):
+                done.add(source_key(record["source"]))
+    return done
+
+
+def _read_records(f, is_csv):
+    if is_csv:
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue  # a partially written last line is simply redone
+
+
+def drop_partial_line(output_path):
+    """Truncate a record left half-written by a killed run, so appends start on a fresh line."""
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            size = min(position, 65536)
+            position -= size
+            f.seek(position)
+            newline = f.read(size).rfind(b"\n")
+            if newline != -1:
+                position += newline + 1
+                break
+        if position != end:
+            logging.warning(f"Dropping a partially written record at the end of {output_path}.")
+            f.truncate(position)
+
+
+class ResultWriter:
+    """Appends one result per image and flushes, so an interrupted run can resume."""
+
+    def __init__(self, output_path):
+        self.is_csv = output_path.endswith(".csv")
+        if os.path.exists(output_path):
+            drop_partial_line(output_path)
+        new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self._file = open(output_path, "a", newline="", encoding="utf-8")
+        if self.is_csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new_file:
+                self._writer.writeheader()
+
+    def write(self, result):
+        if self.is_csv:
+            row = dict(result)
+            row.update({key: value for key, value in (result.get("validation") or {}).items()
+                        if key in CSV_FIELDS})
+            row["parsed"] = json.dumps(result.get("parsed", {}), ensure_ascii=False)
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+# -------------------------------
+# Batch Run
+# -------------------------------
+
+def process_source(pipeline, source, loader):
+    """Decode and run the pipeline for one image, capturing errors in the result."""
+    try:
+        image = decode_image(loader())
+        if image is None:
+            return {"source": source, "error": "Could not decode image."}
+        result = pipeline.process(image)
+    except Exception as e:
+        logging.error(f"Failed to process {source}: {e}")
+        return {"source": source, "error": str(e)}
+    result["source"] = source
+    return result
+
+
+def enrich_source(pipeline, source, detections, ocr_seconds):
+    """Run the post-OCR stages on a pool result, capturing errors in the result like process_source."""
+    start = time.perf_counter()
+    try:
+        result = pipeline.enrich(detections_to_text(detections))
+    except Exception as e:
+        logging.error(f"Failed to process {source}: {e}")
+        return {"source": source, "error": str(e)}
+    result.update({
+        "source": source,
+        "detections": len(detections),
+        "ocr_seconds": round(ocr_seconds, 4),
+        "seconds": round(ocr_seconds + time.perf_counter() - start, 4),
+    })
+    return result
+
+
+def _pending_sources(inputs, done, limit):
+    count = 0
+    for source, loader in iter_sources(inputs):
+        if source_key(source) in done:
+            continue
+        if limit is not None and count >= limit:
+            return
+        count += 1
+        yield source, loader
+
+
+def run_batch(inputs, output_path, pipeline=None, limit=None, workers=1, languages=("en",)):
+    """Process every pending image and append results to output_path. Returns the count processed.
+
+    With workers > 1, OCR runs in a pool of processes (see ocr_workers) and
+    translation, parsing and validation run here as results arrive.
+    """
+    pipeline = pipeline or OcrPipeline(languages=languages)
+    # Opening the writer first drops a half-written last record, so it is not read as done
+    writer = ResultWriter(output_path)
+    done = completed_sources(output_path)
+    if done:
+        logging.info(f"Resuming: {len(done)} images already in {output_path}.")
+    processed = 0
+    start = time.perf_counter()
+    try:
+        if workers > 1:
+            with OcrWorkerPool(workers, languages) as pool:
+                for source, detections, ocr_seconds, error in pool.imap(_pending_sources(inputs, done, limit),
+                                                                         decode_image):
+                    if error is not None:
+                        result = {"source": source, "error": error}
+                    else:
+                        result = enrich_source(pipeline, source, detections, ocr_seconds)
+                    writer.write(result)
+                    processed += 1
+                    logging.info(f"[{processed}] {source}: pincode={result.get('pincode')} "
+                                 f"({result.get('seconds', 0):.2f}s)")
+        else:
+            for source, loader in _pending_sources(inputs, done, limit):
+                result = process_source(pipeline, source, loader)
+                writer.write(result)
+                processed += 1
+                logging.info(f"[{processed}] {source}: pincode={result.get('pincode')} "
+                             f"({result.get('seconds', 0):.2f}s)")
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    logging.info(f"Processed {processed} images in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.2f} images/s).")
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="batch-ocr", description="Headless batch OCR for scanned mail.")
+    parser.add_argument("inputs", nargs="+", help="Image files, directories, globs, or .zip/.tar archives.")
+    parser.add_argument("-o", "--output", default="ocr_results.jsonl", help="Results file (.jsonl or .csv).")
+    parser.add_argument("--limit", type=int, help="Stop after this many new images.")
+    parser.add_argument("--lang", default="en", help="Comma-separated EasyOCR languages.")
+    parser.add_argument("--workers", type=int, default=1, help="OCR worker processes (1 = in-process).")
+    args = parser.parse_args()
+    languages = args.lang.split(",")
+    run_batch(args.inputs, args.output, OcrPipeline(languages=languages), args.limit, args.workers, languages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Filename: bench_lookup.py
+#
+# Compares per-request pincode lookup latency: a SQLAlchemy session + query
+# (the old path) against the in-memory postal index (the current path).
+#
+#   python bench_lookup.py --iterations 20000
+
+import argparse
+import asyncio
+import random
+import time
+
+import main
+from postal_db import SessionLocal, offices_for_pincode
+from postal_index import LatencyTracker
+
+
+def orm_lookup(pincode):
+    db = SessionLocal()
+    try:
+        return offices_for_pincode(db, pincode)
+    finally:
+        db.close()
+
+
+def index_lookup(pincode):
+    return main.postal_index.current.lookup(pincode)
+
+
+def run(iterations):
+    index = asyncio.run(main.load_postal_index())
+    pincodes = list(index.pincodes()) + ["000000", "999999"]  # include misses
+    tracker = LatencyTracker(window=iterations)
+    for name, lookup in (("orm (before)", orm_lookup), ("index (after)", index_lookup)):
+        for _ in range(iterations):
+            pincode = random.choice(pincodes)
+            start = time.perf_counter()
+            lookup(pincode)
+            tracker.record(name, time.perf_counter() - start)
+    for name, stats in tracker.summary().items():
+        print(f"{name:>14}: p50={stats['p50_ms']:.4f} ms  p99={stats['p99_ms']:.4f} ms  (n={stats['count']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pincode lookup latency.")
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.iterations)
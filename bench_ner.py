@@ -0,0 +1,56 @@
+# Filename: bench_ner.py
+#
+# Addresses/sec for the shared NER service at different batch sizes (CPU).
+#
+#   python bench_ner.py --batch-sizes 1,32 --addresses 256
+
+import argparse
+import csv
+import random
+import time
+
+from ner_service import NerService, NER_MODEL, NER_BACKEND, NER_BACKENDS
+
+DEFAULT_CSV = "coimbature_df (1).csv"
+
+
+def synthetic_addresses(csv_path, count, seed=0):
+    """Plausible envelope addresses built from the postal directory."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    rng = random.Random(seed)
+    names = ["Ravi Kumar", "Priya S", "Arun Prakash", "Lakshmi Narayanan", "Mohammed Iqbal"]
+    streets = ["Gandhi Road", "Main Street", "Temple Street", "Avinashi Road", "Bharathi Nagar"]
+    addresses = []
+    for _ in range(count):
+        row = rng.choice(rows)
+        office = row["OfficeName"].rsplit(" ", 1)[0]
+        addresses.append(
+            f"{rng.choice(names)}, {rng.randint(1, 250)} {rng.choice(streets)}, {office}, "
+            f"{row['District'].title()}, {row['StateName'].title()} {row['Pincode']}"
+        )
+    return addresses
+
+
+def run(model, batch_sizes, count, csv_path, backend=NER_BACKEND):
+    service = NerService(model, backend)
+    addresses = synthetic_addresses(csv_path, count)
+    service.parse_addresses(addresses[:4])  # load the model and warm up
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for offset in range(0, len(addresses), batch_size):
+            service.parse_addresses(addresses[offset:offset + batch_size], batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"batch_size={batch_size:>3}: {len(addresses) / elapsed:8.1f} addresses/s "
+              f"({elapsed * 1000 / len(addresses):.2f} ms/address)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched NER address parsing.")
+    parser.add_argument("--model", default=NER_MODEL)
+    parser.add_argument("--backend", default=NER_BACKEND, choices=NER_BACKENDS)
+    parser.add_argument("--batch-sizes", default="1,32")
+    parser.add_argument("--addresses", type=int, default=256)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    args = parser.parse_args()
+    run(args.model, [int(b) for b in args.batch_sizes.split(",")], args.addresses, args.csv, args.backend)
@@ -0,0 +1,47 @@
+# Filename: bench_ocr_workers.py
+#
+# OCR throughput of the worker pool at increasing process counts over the
+# bundled sample images (each repeated to give the pool enough work).
+#
+#   python bench_ocr_workers.py --workers 1,2,4,8 --repeat 4
+
+import argparse
+import os
+import time
+
+from batch_ocr import decode_image, iter_sources
+from ocr_workers import OcrWorkerPool
+
+SAMPLE_IMAGES = ["image1.jpg", "image2.jpg", "image3.jpg", "image4.jpg", "mail1.webp",
+                 "mail11.jpg", "mail12.jpg", "mail13.jpg", "captured_image.png"]
+
+
+def repeated_sources(paths, repeat):
+    """Read every sample once and hand out `repeat` copies under distinct keys."""
+    payloads = [(source, loader()) for source, loader in iter_sources(paths)]
+    for i in range(repeat):
+        for source, data in payloads:
+            yield f"{source}#{i}", (lambda data=data: data)
+
+
+def run(worker_counts, repeat):
+    paths = [path for path in SAMPLE_IMAGES if os.path.exists(path)]
+    baseline = None
+    for workers in worker_counts:
+        with OcrWorkerPool(workers) as pool:
+            pool.wait_ready()  # exclude model loading from the timing
+            start = time.perf_counter()
+            count = sum(1 for _ in pool.imap(repeated_sources(paths, repeat), decode_image))
+            elapsed = time.perf_counter() - start
+        throughput = count / elapsed
+        baseline = baseline or throughput
+        print(f"workers={workers:>2}: {throughput:6.2f} images/s  speedup x{throughput / baseline:.2f}  "
+              f"({count} images in {elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multiprocess OCR worker pool.")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, os.cpu_count() or 1)))
+    parser.add_argument("--repeat", type=int, default=4)
+    args = parser.parse_args()
+    run(sorted({int(w) for w in args.workers.split(",")}), args.repeat)
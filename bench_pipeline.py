@@ -0,0 +1,281 @@
+# Filename: bench_pipeline.py
+#
+# End-to-end benchmark: replays the bundled sample images and synthetic
+# addresses through every stage (decode, preprocess, OCR, translate, NER,
+# pincode extract, validate) and prints per-stage latency percentiles,
+# throughput and peak RSS as JSON, for comparison across commits.
+#
+# Translation and the postal API are local stubs (stub_postal_server), so
+# results do not depend on the network; --translate-delay adds simulated
+# remote latency. The NER stage uses the real model when transformers is
+# installed (--ner stub to skip it).
+#
+#   python bench_pipeline.py --output bench.json
+#   python bench_pipeline.py --addresses 2000 --images 0 --lookup local
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+
+from batch_ocr import decode_image
+from bench_ocr_workers import SAMPLE_IMAGES
+from fuzzy_index import FuzzyPlaceIndex
+from gazetteer import Gazetteer
+from ner_service import extract_pincode, get_ner_service
+from ocr_engines import OcrRouter, create_engines
+from ocr_pipeline import detections_to_text, validate_address
+from ocr_preprocess import PREPROCESS_PRESET, Preprocessor
+from pincode_client import PincodeClient
+from pincode_resolver import POSTAL_DIRECTORY, PincodeResolver, load_directory
+from postal_index import LatencyTracker, PostalIndex
+from stub_postal_server import DEFAULT_CSV, start_stub_server
+from tiered_parser import TieredAddressParser
+from translation import AddressTranslator, PhraseCache, TamilTransliterator
+
+STAGES = ("decode", "preprocess", "ocr", "translate", "ner", "pincode", "validate")
+
+# Tamil spellings swapped into some synthetic addresses, so the translate stage has work
+TAMIL_PLACES = {
+    "Coimbatore": "கோயம்புத்தூர்",
+    "Pollachi": "பொள்ளாச்சி",
+    "Tiruppur": "திருப்பூர்",
+    "Tamil Nadu": "தமிழ்நாடு",
+}
+
+STREETS = ["Main Road", "Gandhi Street", "Temple Street", "Bazaar Street", "Nehru Nagar", "Kamaraj Road"]
+
+# -------------------------------
+# Local Stubs
+# -------------------------------
+
+class StubTranslator:
+    """Stands in for GoogleTranslator: transliterates Tamil locally after an optional simulated delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.transliterator = TamilTransliterator()
+
+    def translate(self, phrase):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.transliterator.translate(phrase, "tamil") or phrase
+
+
+class StubNerService:
+    """Stands in for NerService when transformers is not installed: no entities, regex pincode."""
+
+    def parse_address(self, address):
+        return {}, extract_pincode(address)
+
+# -------------------------------
+# Inputs
+# -------------------------------
+
+def synthetic_addresses(index, count, tamil_ratio=0.25, noise_ratio=0.2, seed=0):
+    """Addresses built from random directory offices, some in Tamil script or with OCR-style slips."""
+    rng = random.Random(seed)
+    offices = [office for pincode in index.pincodes() for office in index.lookup(pincode)]
+    addresses = []
+    for _ in range(count):
+        office = rng.choice(offices)
+        name = (office.post_office or "").rsplit(" ", 1)[0]
+        district = (office.district or "").title()
+        state = (office.state or "").title()
+        address = (f"{rng.randint(1, 250)}, {rng.choice(STREETS)}, {name}, {district}, {state} - "
+                   f"{office.pincode}")
+        if rng.random() < tamil_ratio:
+            for english, tamil in TAMIL_PLACES.items():
+                address = address.replace(english, tamil)
+        if rng.random() < noise_ratio and name:
+            address = address.replace(name, name.replace("o", "0", 1))
+        addresses.append(address)
+    return addresses
+
+
+def load_images(paths):
+    images = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                images.append((path, f.read()))
+        else:
+            logging.warning(f"Skipping missing sample {path}.")
+    return images
+
+# -------------------------------
+# Benchmark
+# -------------------------------
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class PipelineBench:
+    """Runs items through the stages, timing each one in a LatencyTracker."""
+
+    def __init__(self, reader, preprocess, translator, parser, resolver, places):
+        self.reader = reader
+        self.preprocess = preprocess
+        self.translator = translator
+        self.parser = parser
+        self.resolver = resolver
+        self.places = places
+        self.latency = LatencyTracker(window=1000000)
+        self.counters = {"images": 0, "undecodable": 0, "addresses": 0, "pincodes": 0, "validated": 0,
+                         "place_matches": 0}
+
+    def run_text(self, text):
+        with self.latency.time("translate"):
+            translated = self.translator.translate(text) if text.strip() else text
+        with self.latency.time("ner"):
+            _, parsed_pincode = self.parser.parse(translated)
+        with self.latency.time("pincode"):
+            pincode = extract_pincode(translated) or parsed_pincode
+        if not pincode:
+            return
+        self.counters["pincodes"] += 1
+        with self.latency.time("validate"):
+            validation = validate_address(pincode, translated, self.resolver, self.places)
+        self.counters["validated"] += validation.get("valid", False)
+        self.counters["place_matches"] += bool(validation.get("region_match"))
+
+    def run_image(self, data):
+        self.counters["images"] += 1
+        with self.latency.time("decode"):
+            image = decode_image(data)
+        if image is None:
+            self.counters["undecodable"] += 1
+            return
+        with self.latency.time("preprocess"):
+            processed, _ = self.preprocess(image)
+        if self.reader is None:
+            return
+        with self.latency.time("ocr"):
+            detections = self.reader.readtext(processed)
+        self.run_text(detections_to_text(detections))
+
+    def run_address(self, address):
+        self.counters["addresses"] += 1
+        self.run_text(address)
+
+
+def build_bench(args, index):
+    engines = create_engines(["en"], args.engines.split(",")) if args.images else []
+    reader = OcrRouter(engines) if engines else None
+    if args.images and reader is None:
+        logging.warning("No OCR engine is installed; images stop after preprocessing.")
+    if reader is not None:
+        reader.load()
+
+    translator = AddressTranslator(remote=StubTranslator(args.translate_delay), cache=PhraseCache(), offline=False)
+
+    ner = args.ner
+    if ner == "model" and importlib.util.find_spec("transformers") is None:
+        logging.warning("transformers is not installed; using the stub NER service.")
+        ner = "stub"
+    ner_service = get_ner_service() if ner == "model" else StubNerService()
+    parser = TieredAddressParser(Gazetteer.from_index(index), ner_service, stats_log_every=0)
+
+    server = None
+    if args.lookup == "api":
+        server, endpoint = start_stub_server(args.csv, delay=args.api_delay)
+        resolver = PincodeResolver(PostalIndex(), client=PincodeClient(endpoint=endpoint))
+    else:
+        resolver = PincodeResolver(load_directory(args.directory), offline=True)
+
+    config = {"preprocess": args.preprocess, "engines": [engine.name for engine in engines], "ner": ner,
+              "lookup": args.lookup, "translate_delay_s": args.translate_delay, "api_delay_s": args.api_delay}
+    bench = PipelineBench(reader, Preprocessor(args.preprocess), translator, parser, resolver,
+                          FuzzyPlaceIndex.from_index(index))
+    return bench, config, server
+
+
+def run(args):
+    index = PostalIndex.from_csv(args.csv)
+    bench, config, server = build_bench(args, index)
+    try:
+        images = load_images(args.sample_images) if args.images else []
+        addresses = synthetic_addresses(index, args.addresses, seed=args.seed)
+
+        # Warm-up pass, discarded: first-call costs (model graphs, caches, connections) are not steady state
+        for _, data in images[:1]:
+            bench.run_image(data)
+        for address in addresses[:10]:
+            bench.run_address(address)
+        bench.latency = LatencyTracker(window=1000000)
+        bench.counters = dict.fromkeys(bench.counters, 0)
+
+        start = time.perf_counter()
+        for _ in range(args.images):
+            for _, data in images:
+                bench.run_image(data)
+        image_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for address in addresses:
+            bench.run_address(address)
+        address_seconds = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    latency = bench.latency.summary()
+    return {
+        "commit": current_commit(),
+        "python": sys.version.split()[0],
+        "config": config,
+        "stages": {stage: latency[stage] for stage in STAGES if stage in latency},
+        "throughput": {
+            "images_per_s": round(bench.counters["images"] / image_seconds, 3) if bench.counters["images"] else None,
+            "addresses_per_s": (round(bench.counters["addresses"] / address_seconds, 1)
+                                if bench.counters["addresses"] else None),
+        },
+        "counters": bench.counters,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with local stubs.")
+    parser.add_argument("sample_images", nargs="*", default=SAMPLE_IMAGES)
+    parser.add_argument("--images", type=int, default=3, help="Passes over the sample images (0 to skip OCR).")
+    parser.add_argument("--addresses", type=int, default=500, help="Synthetic addresses to run.")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Directory CSV for the stubs and synthetic addresses.")
+    parser.add_argument("--lookup", choices=("api", "local"), default="api",
+                        help="Validate through the stub postal API or the local directory.")
+    parser.add_argument("--directory", default=POSTAL_DIRECTORY, help="Local directory for --lookup local.")
+    parser.add_argument("--engines", default="tesseract,easyocr")
+    parser.add_argument("--preprocess", default=PREPROCESS_PRESET)
+    parser.add_argument("--ner", choices=("model", "stub"), default="model")
+    parser.add_argument("--translate-delay", type=float, default=0.0, help="Simulated remote translation latency (s).")
+    parser.add_argument("--api-delay", type=float, default=0.0, help="Simulated postal API latency (s).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,73 @@
+# Filename: bench_preprocess.py
+#
+# Latency and PIN code extraction per preprocessing preset over the bundled
+# sample images. Accuracy is measured against a truth CSV (source,pincode)
+# when given, otherwise against what the first preset extracts.
+#
+#   python bench_preprocess.py --presets none,fast,document,binary
+#   python bench_preprocess.py scans/*.jpg --truth scans/pincodes.csv
+
+import argparse
+import csv
+import time
+
+import cv2
+import easyocr
+
+from bench_ocr_workers import SAMPLE_IMAGES
+from ner_service import extract_pincode
+from ocr_pipeline import detections_to_text
+from ocr_preprocess import PRESETS, Preprocessor
+from postal_index import percentile
+
+
+def load_truth(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["source"]: row["pincode"] for row in csv.DictReader(f)}
+
+
+def run(paths, presets, repeat, truth=None):
+    reader = easyocr.Reader(["en"], gpu=False)
+    images = {}
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"Skipping {path}: could not decode.")
+            continue
+        images[path] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    reader.readtext(next(iter(images.values())))  # warm-up
+
+    reference = truth
+    for preset in presets:
+        preprocess = Preprocessor(preset)
+        prep_samples, ocr_samples, extracted = [], [], {}
+        for path, image in images.items():
+            for _ in range(repeat):
+                start = time.perf_counter()
+                processed, _ = preprocess(image)
+                prep_samples.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                detections = reader.readtext(processed)
+                ocr_samples.append(time.perf_counter() - start)
+            extracted[path] = extract_pincode(detections_to_text(detections))
+        if reference is None:
+            reference = extracted
+        scored = [path for path in images if reference.get(path)]
+        correct = sum(extracted[path] == reference[path] for path in scored)
+        total = [p + o for p, o in zip(prep_samples, ocr_samples)]
+        print(f"{preset:>9}: preprocess p50 {percentile(prep_samples, 50) * 1000:6.1f} ms  "
+              f"ocr p50 {percentile(ocr_samples, 50) * 1000:7.1f} ms  "
+              f"total p50 {percentile(total, 50) * 1000:7.1f} ms  p99 {percentile(total, 99) * 1000:7.1f} ms  "
+              f"pincodes {sum(1 for pin in extracted.values() if pin)}/{len(images)}  "
+              f"accuracy {correct}/{len(scored)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing presets.")
+    parser.add_argument("images", nargs="*", default=SAMPLE_IMAGES)
+    parser.add_argument("--presets", default=",".join(PRESETS),
+                        help="Comma-separated presets; the first is the accuracy reference without --truth.")
+    parser.add_argument("--truth", help="CSV with source,pincode columns.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.images, args.presets.split(","), args.repeat, load_truth(args.truth) if args.truth else None)
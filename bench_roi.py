@@ -0,0 +1,63 @@
+# Filename: bench_roi.py
+#
+# OCR latency with and without address-block ROI detection on the sample
+# mail images, and whether the PIN code is still recovered from the text.
+#
+#   python bench_roi.py --repeat 3
+#   python bench_roi.py mail11.jpg mail12.jpg --modes off,detector
+
+import argparse
+import glob
+import time
+
+import cv2
+import easyocr
+
+from address_roi import ROI_MODES, AddressBlockReader
+from ner_service import extract_pincode
+from ocr_pipeline import detections_to_text
+from postal_index import percentile
+
+SAMPLE_IMAGES = sorted(glob.glob("mail*.jpg")) + sorted(glob.glob("mail*.webp"))
+
+
+def run(paths, modes, repeat):
+    reader = easyocr.Reader(["en"], gpu=False)
+    images = {}
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"Skipping {path}: could not decode.")
+            continue
+        images[path] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    baseline = None
+    for mode in modes:
+        roi_reader = AddressBlockReader(reader, mode)
+        roi_reader.readtext(next(iter(images.values())))  # warm-up
+        roi_reader.counters = dict.fromkeys(roi_reader.counters, 0)
+        samples, pincodes, chars = [], 0, 0
+        for path, image in images.items():
+            for _ in range(repeat):
+                start = time.perf_counter()
+                detections = roi_reader.readtext(image)
+                samples.append(time.perf_counter() - start)
+            text = detections_to_text(detections)
+            chars += len(text)
+            pincodes += extract_pincode(text) is not None
+            print(f"  [{mode}] {path}: {text[:80]!r}")
+        p50 = percentile(samples, 50)
+        baseline = baseline or p50
+        print(f"{mode:>9}: p50 {p50 * 1000:7.1f} ms  p99 {percentile(samples, 99) * 1000:7.1f} ms  "
+              f"x{baseline / p50:.2f} vs {modes[0]}  pincodes {pincodes}/{len(images)}  "
+              f"chars {chars}  {roi_reader.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark address-block ROI detection before OCR.")
+    parser.add_argument("images", nargs="*", default=SAMPLE_IMAGES)
+    parser.add_argument("--modes", default="off,detector,contours",
+                        help=f"Comma-separated modes from {', '.join(ROI_MODES)}; the first is the baseline.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.images, args.modes.split(","), args.repeat)
@@ -0,0 +1,107 @@
+# Filename: bench_startup.py
+#
+# Startup cost of the entry points: wall time of importing each module in a
+# fresh interpreter, with the `python -X importtime` breakdown of the
+# slowest imports. Save the JSON and compare later runs against it to catch
+# an eager heavy import creeping back in.
+#
+#   python bench_startup.py
+#   python bench_startup.py main new --top 15 --json startup.json
+#   python bench_startup.py --compare startup.json
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ENTRY_POINTS = ["main", "new", "ocr_validation", "ocr_validation_1", "pincode_resolver", "components"]
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def time_import(module, env):
+    """(wall seconds, importtime entries) for importing module in a fresh interpreter."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, env=env)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+    return wall, parse_importtime(completed.stderr)
+
+
+def run(modules, repeat, top):
+    env = dict(os.environ)
+    # main.py creates its tables at import: keep that away from the real database
+    env.setdefault("POSTAL_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/startup.db")
+    baseline = statistics.median(time_import("sys", env)[0] for _ in range(repeat))
+    report = {"python": sys.version.split()[0], "interpreter_ms": round(baseline * 1000, 1), "modules": {}}
+    for module in modules:
+        try:
+            runs = [time_import(module, env) for _ in range(repeat)]
+        except RuntimeError as e:
+            report["modules"][module] = {"error": str(e)}
+            continue
+        wall = statistics.median(wall for wall, _ in runs)
+        imports = runs[-1][1]
+        entry = next(i for i in imports if i[0] == module and i[3] == 0)
+        # Top-level packages only, so nested imports are not counted twice
+        heaviest = sorted((i for i in imports if i[3] == 1 and i[0] != module), key=lambda i: -i[2])[:top]
+        report["modules"][module] = {
+            "wall_ms": round(wall * 1000, 1),
+            "import_ms": round(entry[2] / 1000, 1),
+            "modules_imported": len(imports),
+            "heaviest": [{"module": name, "cumulative_ms": round(cumulative / 1000, 1), "self_ms": round(own / 1000, 1)}
+                         for name, own, cumulative, _ in heaviest],
+        }
+    return report
+
+
+def print_report(report, previous=None):
+    print(f"Python {report['python']}, bare interpreter {report['interpreter_ms']} ms")
+    for module, result in report["modules"].items():
+        if "error" in result:
+            print(f"\n{module}: {result['error']}")
+            continue
+        change = ""
+        before = (previous or {}).get("modules", {}).get(module, {}).get("import_ms")
+        if before:
+            change = f"  ({result['import_ms'] - before:+.1f} ms vs previous)"
+        print(f"\n{module}: import {result['import_ms']} ms, wall {result['wall_ms']} ms, "
+              f"{result['modules_imported']} modules{change}")
+        for item in result["heaviest"]:
+            print(f"  {item['cumulative_ms']:9.1f} ms  {item['module']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark entry-point import time.")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest direct imports listed per module.")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    parser.add_argument("--compare", help="Earlier --json report to compare against.")
+    args = parser.parse_args()
+
+    report = run(args.modules, args.repeat, args.top)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
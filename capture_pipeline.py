@@ -0,0 +1,244 @@
+# Filename: capture_pipeline.py
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+from ocr_pipeline import detections_to_text
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Captured frames waiting for OCR; further captures are refused while it is full
+OCR_QUEUE_SIZE = 2
+
+# Recognized text waiting for translate/parse/validate
+ENRICH_QUEUE_SIZE = 8
+
+# Enrichments allowed in flight at once (translation and lookups are I/O-bound)
+MAX_CONCURRENT_ENRICH = 4
+
+LIVE_WINDOW = 'Live Feed - Press "c" to Capture and Recognize Text, "q" to Quit'
+
+# -------------------------------
+# Pipeline Stages
+# -------------------------------
+
+class LatestFrame:
+    """Single-slot buffer: the capture thread overwrites, readers always see the newest frame."""
+
+    def __init__(self):
+        self._frame = None
+        self._frame_id = 0
+        self._lock = threading.Lock()
+
+    def put(self, frame):
+        with self._lock:
+            self._frame = frame
+            self._frame_id += 1
+
+    def get(self):
+        with self._lock:
+            return self._frame_id, self._frame
+
+
+class CapturePipeline:
+    """Camera capture, OCR and enrichment as separate stages over bounded queues.
+
+    - capture thread: reads the camera as fast as it delivers frames;
+    - UI loop (caller's thread): shows the newest frame with the latest
+      result overlaid and enqueues a copy when 'c' is pressed;
+    - OCR thread: runs EasyOCR on queued frames;
+    - enrichment thread: an asyncio loop that translates, parses and
+      validates several captures concurrently.
+
+    When OCR is busy and its queue is full, a new capture is refused rather
+    than queued without bound, so the live feed never waits on OCR.
+
+    With a frame_gate (see auto_capture.FrameGate) frames are captured
+    automatically once per new, still, in-focus envelope; 'c' still works.
+    """
+
+    def __init__(self, pipeline, camera_index=0, on_result=None, frame_gate=None):
+        self.pipeline = pipeline
+        self.frame_gate = frame_gate
+        self.camera_index = camera_index
+        self.on_result = on_result
+        self.latest = LatestFrame()
+        self.ocr_queue = queue.Queue(maxsize=OCR_QUEUE_SIZE)
+        self.enrich_queue = queue.Queue(maxsize=ENRICH_QUEUE_SIZE)
+        self.stop_event = threading.Event()
+        self._result_lock = threading.Lock()
+        self._overlay = None  # (detections, status line)
+        self.counters = {"frames": 0, "captures": 0, "refused": 0, "results": 0}
+
+    # Capture stage
+
+    def _capture_loop(self, cap):
+        while not self.stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                logging.error("Failed to capture frame from camera.")
+                self.stop_event.set()
+                break
+            self.latest.put(frame)
+            self.counters["frames"] += 1
+
+    # OCR stage
+
+    def _ocr_loop(self):
+        import cv2
+
+        while not self.stop_event.is_set():
+            try:
+                capture_id, frame = self.ocr_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            try:
+                detections = self.pipeline.read_text(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            except Exception as e:
+                logging.error(f"Error recognizing text: {e}")
+                continue
+            logging.info(f"Capture {capture_id}: {len(detections)} text regions in {time.perf_counter() - start:.2f}s.")
+            if not detections:
+                logging.warning("No text detected in the frame.")
+                self._set_overlay([], "No text detected")
+                continue
+            self._set_overlay(detections, "Recognized, validating...")
+            # Backpressure: OCR waits here while enrichment is backed up
+            while not self.stop_event.is_set():
+                try:
+                    self.enrich_queue.put((capture_id, detections), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    # Enrichment stage
+
+    def _enrich_thread(self):
+        asyncio.run(self._enrich_loop())
+
+    async def _enrich_loop(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(MAX_CONCURRENT_ENRICH)
+        tasks = set()
+        while not self.stop_event.is_set():
+            try:
+                capture_id, detections = await loop.run_in_executor(None, self.enrich_queue.get, True, 0.1)
+            except queue.Empty:
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(self._enrich_one(capture_id, detections, slots))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _enrich_one(self, capture_id, detections, slots):
+        try:
+            result = await asyncio.to_thread(self.pipeline.enrich, detections_to_text(detections))
+        except Exception as e:
+            logging.error(f"Error enriching capture {capture_id}: {e}")
+            return
+        finally:
+            slots.release()
+        result["capture_id"] = capture_id
+        self.counters["results"] += 1
+        logging.info(f"Capture {capture_id}: {result.get('translated')!r} -> pincode {result.get('pincode')}, "
+                     f"validation {result.get('validation')}")
+        self._set_overlay(detections, status_line(result))
+        if self.on_result is not None:
+            self.on_result(result)
+
+    # Overlay
+
+    def _set_overlay(self, detections, status):
+        with self._result_lock:
+            self._overlay = (detections, status)
+
+    def _draw(self, frame):
+        import cv2
+
+        with self._result_lock:
+            overlay = self._overlay
+        if overlay is None:
+            return frame
+        frame = frame.copy()
+        detections, status = overlay
+        for detection in detections:
+            top_left = tuple(map(int, detection[0][0]))
+            bottom_right = tuple(map(int, detection[0][2]))
+            cv2.rectangle(frame, top_left, bottom_right, (0, 255, 0), 2)
+            cv2.putText(frame, detection[1], top_left, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (36, 255, 12), 2)
+        cv2.putText(frame, status, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        return frame
+
+    # UI loop
+
+    def request_capture(self, frame, capture_id):
+        """Queue a frame for OCR. Returns False (and drops it) if OCR is saturated."""
+        try:
+            self.ocr_queue.put_nowait((capture_id, frame.copy()))
+        except queue.Full:
+            self.counters["refused"] += 1
+            logging.warning("OCR is busy; capture ignored.")
+            return False
+        self.counters["captures"] += 1
+        return True
+
+    def run(self):
+        import cv2  # imported with the camera, so importing this module stays cheap
+
+        cap = cv2.VideoCapture(self.camera_index)
+        if not cap.isOpened():
+            logging.error("Could not open the camera.")
+            return
+        threads = [
+            threading.Thread(target=self._capture_loop, args=(cap,), name="capture", daemon=True),
+            threading.Thread(target=self._ocr_loop, name="ocr", daemon=True),
+            threading.Thread(target=self._enrich_thread, name="enrich", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        last_shown = 0
+        try:
+            while not self.stop_event.is_set():
+                frame_id, frame = self.latest.get()
+                if frame is not None and frame_id != last_shown:
+                    last_shown = frame_id
+                    cv2.imshow(LIVE_WINDOW, self._draw(frame))
+                    # Only gate frames OCR could accept, so a busy OCR stage does not swallow an envelope
+                    if self.frame_gate is not None and not self.ocr_queue.full() \
+                            and self.frame_gate.should_capture(frame):
+                        self.request_capture(frame, frame_id)
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('c') and frame is not None:
+                    self.request_capture(frame, frame_id)
+                elif key == ord('q'):
+                    break
+        finally:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join(timeout=2)
+            cap.release()
+            cv2.destroyAllWindows()
+            logging.info(f"Capture pipeline stats: {self.counters}")
+            if self.frame_gate is not None:
+                logging.info(f"Auto-capture frames: {self.frame_gate.stats()}")
+
+
+def status_line(result):
+    """One-line overlay summary of an enrichment result."""
+    pincode = result.get("pincode")
+    if not pincode:
+        return "No PIN code detected"
+    validation = result.get("validation") or {}
+    if not validation.get("valid"):
+        return f"PIN {pincode}: {validation.get('error', 'not found')}"
+    place = validation.get("place_match")
+    match = f"matches {place['name']}" if place else "place mismatch"
+    return f"PIN {pincode}: {validation.get('post_office')} ({match})"
@@ -0,0 +1,83 @@
+# Filename: compare_ner_backends.py
+#
+# Accuracy vs latency of the NER backends over a fixed set of sample
+# addresses. The plain torch pipeline is the reference; other backends are
+# scored by how many of its (entity, word) pairs they reproduce.
+#
+#   python compare_ner_backends.py
+#   python compare_ner_backends.py --model ai4bharat/IndicNER --backends torch,onnx
+
+import argparse
+import time
+
+from ner_service import NerService, NER_MODEL, NER_BACKENDS, group_entities
+from postal_index import percentile
+
+SAMPLE_ADDRESSES = [
+    "Ravi Kumar, 12 Gandhi Road, Belladi, Coimbatore, Tamil Nadu 641104",
+    "Priya S, 45 Temple Street, Chikkarampalayam, Coimbatore 641104",
+    "Arun Prakash, Door No 7, Avinashi Road, Peelamedu, Coimbatore, Tamil Nadu 641004",
+    "Lakshmi Narayanan, 3rd Cross, R S Puram, Coimbatore 641002",
+    "Mohammed Iqbal, 88 Main Street, Pollachi, Tamil Nadu 642001",
+    "The Manager, State Bank of India, Tirupur Main Branch, Tirupur 641601",
+    "Dr. Meena Sundaram, Kovai Medical Center, Avinashi Road, Coimbatore 641014",
+    "Flat No 501, Mahal Ingapura, Coimbatore, Karnataka 560038",
+    "123 MG Road, Bangalore, Karnataka, 560001",
+    "Suresh Babu, Allapalayam, Tirupur District, Tamil Nadu 641653",
+    "K. Ramasamy, Mangalakaraipudur, Karamadai, Coimbatore 641104",
+    "Anitha Devi, 19 Bharathi Nagar, Mettupalayam, Coimbatore 641301",
+]
+
+
+def entity_pairs(entities):
+    return {(label, word) for label, words in group_entities(entities).items() for word in words}
+
+
+def run_backend(model, backend, addresses, repeats):
+    service = NerService(model, backend)
+    start = time.perf_counter()
+    service.pipeline  # force load
+    load_seconds = time.perf_counter() - start
+    latencies = []
+    outputs = []
+    for _ in range(repeats):
+        outputs = []
+        for address in addresses:
+            start = time.perf_counter()
+            outputs.append(service(address))
+            latencies.append(time.perf_counter() - start)
+    return load_seconds, latencies, [entity_pairs(entities) for entities in outputs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare NER backends on accuracy and latency.")
+    parser.add_argument("--model", default=NER_MODEL)
+    parser.add_argument("--backends", default=",".join(NER_BACKENDS))
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    if "torch" not in backends:
+        backends.insert(0, "torch")  # reference output
+
+    results = {}
+    for backend in backends:
+        try:
+            results[backend] = run_backend(args.model, backend, SAMPLE_ADDRESSES, args.repeats)
+        except ImportError as e:
+            print(f"{backend}: skipped ({e})")
+
+    reference = results["torch"][2]
+    print(f"{'backend':<10} {'load s':>7} {'p50 ms':>8} {'p99 ms':>8} {'precision':>9} {'recall':>7}")
+    for backend, (load_seconds, latencies, pairs) in results.items():
+        matched = sum(len(ref & got) for ref, got in zip(reference, pairs))
+        produced = sum(len(got) for got in pairs)
+        expected = sum(len(ref) for ref in reference)
+        precision = matched / produced if produced else 1.0
+        recall = matched / expected if expected else 1.0
+        print(f"{backend:<10} {load_seconds:>7.1f} {percentile(latencies, 50) * 1000:>8.2f} "
+              f"{percentile(latencies, 99) * 1000:>8.2f} {precision:>9.3f} {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Filename: components.py
+
+import logging
+import os
+import threading
+import time
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Components the entry points load in the background at startup ("" to load everything on first use)
+WARM_UP = [name for name in os.environ.get("COMPONENTS_WARM_UP", "reader").split(",") if name.strip()]
+
+# Languages of the shared OCR reader
+OCR_LANGUAGES = os.environ.get("OCR_LANGUAGES", "en").split(",")
+
+# -------------------------------
+# Lazy Component Registry
+# -------------------------------
+
+class LazyComponent:
+    """A heavy dependency built by its factory on first use, exactly once, from any thread."""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.load_seconds = None
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._value = self.factory()
+                    self.load_seconds = time.perf_counter() - start
+                    self._loaded = True
+                    logging.info(f"Loaded {self.name} in {self.load_seconds:.2f}s.")
+        return self._value
+
+
+class ComponentProxy:
+    """Stands in for a component and loads it on first attribute access."""
+
+    def __init__(self, component):
+        self._component = component
+
+    def __getattr__(self, name):
+        return getattr(self._component.get(), name)
+
+
+class ComponentRegistry:
+    """Named LazyComponents, so entry points import and load models only when they use them.
+
+    Factories import their modules themselves: registering a component costs
+    nothing, and a process that never reads an image never imports the OCR
+    stack. warm_up() loads components on a background thread so the first
+    request does not pay for them; a get() racing the warm-up waits for the
+    same load instead of starting another.
+    """
+
+    def __init__(self):
+        self._components = {}
+
+    def register(self, name, factory):
+        self._components[name] = LazyComponent(name, factory)
+        return self._components[name]
+
+    def get(self, name):
+        return self._components[name].get()
+
+    def proxy(self, name):
+        """Drop-in for the component at module level: nothing loads until it is used."""
+        return ComponentProxy(self._components[name])
+
+    def is_loaded(self, name):
+        return name in self._components and self._components[name].loaded
+
+    def _load_all(self, names):
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                # Left unloaded: the first get() retries and raises to its caller
+                logging.error(f"Warm-up of {name} failed: {e}")
+
+    def warm_up(self, names=WARM_UP, background=True):
+        """Load the named components, on a daemon thread by default (returned, or None)."""
+        unknown = [name for name in names if name not in self._components]
+        if unknown:
+            raise ValueError(f"Unknown components {unknown}; expected some of {sorted(self._components)}.")
+        if not background:
+            self._load_all(names)
+            return None
+        thread = threading.Thread(target=self._load_all, args=(list(names),), name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {name: {"loaded": component.loaded,
+                       "load_ms": round(component.load_seconds * 1000, 1) if component.loaded else None}
+                for name, component in self._components.items()}
+
+# -------------------------------
+# Shared Components
+# -------------------------------
+
+def _load_reader():
+    from ocr_engines import create_reader
+
+    # Frames are normalized (OCR_PREPROCESS), Tesseract reads clean labels and EasyOCR, on the
+    # address block only, takes over when its confidence is low (OCR_ENGINES)
+    reader = create_reader(OCR_LANGUAGES)
+    try:
+        reader.load()
+    except RuntimeError:
+        logging.error("There was an issue loading the OCR language model. Try updating or re-installing EasyOCR.")
+        raise
+    return reader
+
+
+def _load_translator():
+    from translation import get_translator
+
+    return get_translator()
+
+
+def _load_ner():
+    from ner_service import get_ner_service
+
+    service = get_ner_service()
+    service.pipeline  # loads the model
+    return service
+
+
+def _load_address_parser():
+    from ner_service import get_ner_service
+    from tiered_parser import get_tiered_parser
+
+    # Postal gazetteer fast path; the NER model still loads only when an address is ambiguous
+    return get_tiered_parser(get_ner_service())
+
+
+def _load_resolver():
+    from pincode_resolver import get_resolver
+
+    return get_resolver()
+
+
+components = ComponentRegistry()
+components.register("reader", _load_reader)
+components.register("translator", _load_translator)
+components.register("ner", _load_ner)
+components.register("address_parser", _load_address_parser)
+components.register("resolver", _load_resolver)
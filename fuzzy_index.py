@@ -0,0 +1,195 @@
+# Filename: fuzzy_index.py
+
+import math
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from postal_index import PostalIndex
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Trigram Dice similarity (0-1) at which a stretch of text counts as naming a place
+MATCH_THRESHOLD = 0.6
+
+# Longest place name, in words, looked for in scanned text
+MAX_PHRASE_WORDS = 4
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words dropped from directory names ("Tirupur Division" -> "tirupur")
+_NOISE_WORDS = {"division", "region", "circle", "bo", "so", "ho", "po", "gpo"}
+
+# Digits OCR reads in place of letters inside words ("C0imbat0re")
+_OCR_DIGITS = str.maketrans("0158", "olsb")
+
+# Spellings of the same sound in romanized Indian place names, applied in order
+_FOLDS = (("ph", "f"), ("th", "t"), ("dh", "d"), ("bh", "b"), ("kh", "k"), ("gh", "g"), ("zh", "l"),
+          ("sh", "s"), ("ch", "s"), ("c", "k"), ("q", "k"), ("w", "v"), ("z", "s"), ("ee", "i"),
+          ("oo", "u"), ("ou", "u"), ("y", "i"))
+_REPEATS = re.compile(r"(.)\1+")
+
+# -------------------------------
+# Normalization
+# -------------------------------
+
+def _fold_word(word):
+    if not word.isdigit():
+        word = word.translate(_OCR_DIGITS)
+    for spelling, sound in _FOLDS:
+        word = word.replace(spelling, sound)
+    return _REPEATS.sub(r"\1", word)
+
+
+def fold(text):
+    """Lowercase, strip punctuation and fold transliteration variants: "Koyamputthoor" -> "koiamputur"."""
+    return " ".join(_fold_word(word) for word in _WORD.findall((text or "").lower()))
+
+
+@lru_cache(maxsize=65536)
+def trigrams(folded):
+    padded = f"  {folded} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a, b):
+    """Dice coefficient of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+def _name_phrase(name):
+    words = _WORD.findall(name.lower())
+    while words and words[-1] in _NOISE_WORDS:
+        words = words[:-1]
+    return fold(" ".join(words))
+
+
+def _windows(text, max_words=MAX_PHRASE_WORDS):
+    """(original words, folded phrase) for every run of 1..max_words words in text.
+
+    Runs stop at numbers (house numbers, PIN codes), which never belong to a place name.
+    """
+    words = _WORD.findall((text or "").lower())
+    folded = [None if word.isdigit() else _fold_word(word) for word in words]
+    for start in range(len(words)):
+        for end in range(start + 1, min(len(words), start + max_words) + 1):
+            if folded[end - 1] is None:
+                break
+            yield " ".join(words[start:end]), " ".join(folded[start:end])
+
+# -------------------------------
+# Matching
+# -------------------------------
+
+class PlaceMatch(NamedTuple):
+    kind: str          # "office", "district", "division" or "region"
+    name: str          # directory spelling
+    score: float       # trigram similarity, 1.0 for an exact (folded) match
+    text: str          # the words of the scanned text that matched
+    pincodes: frozenset
+
+
+def api_place_names(post_offices):
+    """(kind, name) pairs for the PostOffice records of a pincode lookup."""
+    names = set()
+    for office in post_offices:
+        for kind, key in (("office", "Name"), ("district", "District"), ("division", "Division")):
+            if office.get(key):
+                names.add((kind, office[key]))
+        # "Western Region, Coimbatore" -> "Western Region" and "Coimbatore"
+        for part in (office.get("Region") or "").split(","):
+            if part.strip():
+                names.add(("region", part.strip()))
+    return sorted(names)
+
+
+def best_match(names, text, threshold=MATCH_THRESHOLD, pincodes=frozenset()):
+    """Best fuzzy occurrence of any (kind, name) in text, or None below threshold."""
+    targets = [(kind, name, trigrams(_name_phrase(name))) for kind, name in names]
+    targets = [target for target in targets if target[2]]
+    best = None
+    for words, folded in _windows(text):
+        grams = trigrams(folded)
+        for kind, name, name_grams in targets:
+            score = similarity(grams, name_grams)
+            if score >= threshold and (best is None or score > best.score):
+                best = PlaceMatch(kind, name, round(score, 3), words, pincodes)
+    return best
+
+
+class FuzzyPlaceIndex:
+    """Trigram index over office, district, division and region names.
+
+    Names are folded (see fold) so OCR slips and transliteration variants
+    land on the same trigrams. search() scores every 1-4 word window of
+    the text against only the names sharing a trigram with it, via the
+    posting lists; consistency() compares the text with the names of one
+    pincode.
+    """
+
+    def __init__(self):
+        self._entries = []     # (kind, name, trigrams, pincodes)
+        self._postings = {}    # trigram -> [entry id]
+        self._by_pincode = {}  # pincode -> [(kind, name)]
+        self.max_words = 1
+
+    def add(self, kind, name, pincodes):
+        phrase = _name_phrase(name)
+        if not phrase:
+            return
+        grams = trigrams(phrase)
+        self.max_words = min(MAX_PHRASE_WORDS, max(self.max_words, len(phrase.split())))
+        entry_id = len(self._entries)
+        self._entries.append((kind, name, grams, frozenset(pincodes)))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+        for pincode in pincodes:
+            self._by_pincode.setdefault(pincode, []).append((kind, name))
+
+    @classmethod
+    def from_index(cls, index: PostalIndex):
+        grouped = {}
+        for pincode in index.pincodes():
+            for kind, name in api_place_names(office.as_api_record() for office in index.lookup(pincode)):
+                grouped.setdefault((kind, name), set()).add(pincode)
+        places = cls()
+        for (kind, name), pincodes in sorted(grouped.items()):
+            places.add(kind, name, pincodes)
+        return places
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        return cls.from_index(PostalIndex.from_csv(csv_path))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def search(self, text, limit=5, kinds=None, threshold=MATCH_THRESHOLD):
+        """Best-matching places named in text, highest score first (one match per place)."""
+        best = {}
+        for words, folded in _windows(text, self.max_words):
+            grams = trigrams(folded)
+            # Prefix filter: a name reaching the threshold shares at least `needed` trigrams with the
+            # window, so it must share one of the len(grams) - needed + 1 rarest; only those are scored
+            needed = math.ceil(threshold * len(grams) / (2.0 - threshold))
+            rarest = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))[:len(grams) - needed + 1]
+            candidates = {entry_id for gram in rarest for entry_id in self._postings.get(gram, ())}
+            for entry_id in candidates:
+                kind, name, name_grams, pincodes = self._entries[entry_id]
+                if kinds and kind not in kinds:
+                    continue
+                score = similarity(grams, name_grams)
+                if score < threshold:
+                    continue
+                if entry_id not in best or score > best[entry_id].score:
+                    best[entry_id] = PlaceMatch(kind, name, round(score, 3), words, pincodes)
+        return sorted(best.values(), key=lambda match: (-match.score, match.name))[:limit]
+
+    def consistency(self, pincode, text, threshold=MATCH_THRESHOLD):
+        """Best match between text and the places of this pincode, or None."""
+        names = self._by_pincode.get(pincode, ())
+        return best_match(names, text, threshold, frozenset([pincode]))
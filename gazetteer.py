@@ -0,0 +1,101 @@
+# Filename: gazetteer.py
+
+import re
+from typing import NamedTuple
+
+from postal_index import PostalIndex, office_key
+
+# -------------------------------
+# Place-Name Gazetteer
+# -------------------------------
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words dropped from directory names before they become gazetteer terms
+_NOISE_SUFFIXES = {"division", "region", "circle"}
+
+
+def tokenize(text):
+    return _TOKEN.findall((text or "").lower())
+
+
+class Match(NamedTuple):
+    kind: str          # "office", "district", "division", "region" or "circle"
+    name: str          # directory spelling
+    pincodes: frozenset
+    start: int         # token offsets in the scanned text
+    end: int
+
+
+class Gazetteer:
+    """Token trie over office, district, division, region and circle names.
+
+    find() walks the trie from every token of the text and keeps the
+    longest phrase starting there, so a scan costs O(tokens x longest
+    phrase) with no regex backtracking.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.max_phrase = 0
+
+    def add(self, phrase, kind, name, pincodes):
+        tokens = tokenize(phrase)
+        while tokens and tokens[-1] in _NOISE_SUFFIXES:
+            tokens = tokens[:-1]
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        entries = node.setdefault(None, {})
+        key = (kind, name)
+        entries[key] = entries.get(key, frozenset()) | frozenset(pincodes)
+        self.max_phrase = max(self.max_phrase, len(tokens))
+
+    @classmethod
+    def from_index(cls, index: PostalIndex):
+        gazetteer = cls()
+        fields = (("office", "post_office"), ("district", "district"), ("division", "division"),
+                  ("circle", "circle"))
+        grouped = {}
+        for pincode in index.pincodes():
+            for office in index.lookup(pincode):
+                for kind, field in fields:
+                    value = getattr(office, field)
+                    if value:
+                        grouped.setdefault((kind, value), set()).add(pincode)
+                # "Western Region, Coimbatore" -> "western region" and "coimbatore"
+                for part in (office.region or "").split(","):
+                    if part.strip():
+                        grouped.setdefault(("region", part.strip()), set()).add(pincode)
+        for (kind, value), pincodes in grouped.items():
+            phrase = office_key(value) if kind == "office" else value
+            gazetteer.add(phrase, kind, value, pincodes)
+        return gazetteer
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        return cls.from_index(PostalIndex.from_csv(csv_path))
+
+    def find(self, text):
+        """Longest gazetteer phrases found in the text, left to right, non-overlapping."""
+        tokens = tokenize(text)
+        matches = []
+        position = 0
+        while position < len(tokens):
+            node = self._root
+            best_end, best_entries = None, None
+            for end in range(position, min(len(tokens), position + self.max_phrase)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    best_end, best_entries = end + 1, node[None]
+            if best_entries is None:
+                position += 1
+                continue
+            for (kind, name), pincodes in best_entries.items():
+                matches.append(Match(kind, name, pincodes, position, best_end))
+            position = best_end
+        return matches
@@ -0,0 +1,219 @@
+# Filename: geo_index.py
+
+import math
+import os
+
+import numpy as np
+
+from postal_index import PostalIndex
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Grid cell size; ~28 km at Indian latitudes, so a nearest-office query touches a handful of cells
+GRID_CELL_DEGREES = 0.25
+
+# How far a scanning station may be from a pincode's nearest office before the pincode is suspect
+MAX_STATION_DISTANCE_KM = float(os.environ.get("POSTAL_MAX_STATION_DISTANCE_KM", "60"))
+
+# Most query x office dot products held at once (~32 MB of float64); blocks of queries are sized from it
+BLOCK_ELEMENTS = 1 << 22
+
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# -------------------------------
+# Geometry
+# -------------------------------
+
+def unit_vectors(lats, lons):
+    """(n, 3) unit vectors for latitudes/longitudes in degrees."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(dots):
+    """Great-circle distance from the dot product of two unit vectors."""
+    return EARTH_RADIUS_KM * np.arccos(np.clip(dots, -1.0, 1.0))
+
+
+def coordinate_in_range(lat, lon):
+    """Is (lat, lon) a real point on the globe? Used for query coordinates."""
+    if lat is None or lon is None or math.isnan(lat) or math.isnan(lon):
+        return False
+    return -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0
+
+
+def valid_coordinate(lat, lon):
+    """Does an office row carry a usable location? (0, 0) is the directory's "unknown" placeholder."""
+    return coordinate_in_range(lat, lon) and (lat, lon) != (0.0, 0.0)
+
+# -------------------------------
+# Spatial Index
+# -------------------------------
+
+class GeoIndex:
+    """Nearest-office index over the directory's latitude/longitude.
+
+    Offices are bucketed in a GRID_CELL_DEGREES grid. A single query
+    searches rings of cells outwards and stops once the ring is further
+    away than the n-th nearest office found, so it only computes distances
+    for nearby offices. Bulk queries are grouped by cell and each group
+    runs the same search with NumPy, so a batch of points costs about as
+    many dot products as answering them one by one.
+    """
+
+    def __init__(self, offices=()):
+        offices = tuple(o for o in offices if valid_coordinate(o.latitude, o.longitude))
+        self.offices = offices
+        self.lats = np.array([o.latitude for o in offices], dtype=np.float64)
+        self.lons = np.array([o.longitude for o in offices], dtype=np.float64)
+        self.vectors = unit_vectors(self.lats, self.lons).reshape(-1, 3)
+        self.delivery = np.array([(o.delivery or "").lower() == "delivery" for o in offices], dtype=bool)
+        self._delivery_count = int(self.delivery.sum())
+        cells = {}
+        by_pincode = {}
+        for i, office in enumerate(offices):
+            cells.setdefault(self._cell(office.latitude, office.longitude), []).append(i)
+            by_pincode.setdefault(office.pincode, []).append(i)
+        self._cells = {cell: np.array(ids, dtype=np.int64) for cell, ids in cells.items()}
+        self._by_pincode = {pincode: np.array(ids, dtype=np.int64) for pincode, ids in by_pincode.items()}
+        if cells:
+            rows = [cell[0] for cell in cells]
+            columns = [cell[1] for cell in cells]
+            self._extent = (min(rows), max(rows), min(columns), max(columns))
+
+    @classmethod
+    def from_index(cls, index: PostalIndex):
+        return cls(office for pincode in index.pincodes() for office in index.lookup(pincode))
+
+    def __len__(self):
+        return len(self.offices)
+
+    @staticmethod
+    def _cell(lat, lon):
+        return int(math.floor(lat / GRID_CELL_DEGREES)), int(math.floor(lon / GRID_CELL_DEGREES))
+
+    def _ring(self, row, column, radius):
+        if radius == 0:
+            cells = [(row, column)]
+        else:
+            cells = [(row + d, column + side) for d in range(-radius, radius + 1) for side in (-radius, radius)]
+            cells += [(row + side, column + d) for d in range(-radius + 1, radius) for side in (-radius, radius)]
+        return [self._cells[cell] for cell in cells if cell in self._cells]
+
+    def _top_n(self, ids, queries, n):
+        """(office positions, dot products) of the n offices among ids nearest to each query, nearest first.
+
+        Queries are taken in blocks sized from len(ids), so no block holds
+        more than BLOCK_ELEMENTS dot products.
+        """
+        vectors = self.vectors[ids]
+        positions = np.empty((len(queries), n), dtype=np.int64)
+        dots = np.empty((len(queries), n), dtype=np.float64)
+        step = max(1, BLOCK_ELEMENTS // len(ids))
+        for start in range(0, len(queries), step):
+            block = queries[start:start + step] @ vectors.T
+            top = np.argpartition(-block, n - 1, axis=1)[:, :n]
+            top_dots = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_dots, axis=1)
+            positions[start:start + len(block)] = ids[np.take_along_axis(top, order, axis=1)]
+            dots[start:start + len(block)] = np.take_along_axis(top_dots, order, axis=1)
+        return positions, dots
+
+    def _search(self, row, column, queries, max_abs_lat, n, delivery_only):
+        """_top_n for queries in one grid cell, over rings of cells searched outwards.
+
+        Stops once the n-th nearest office of every query is closer than
+        anything outside the searched block. n must not exceed the number of
+        candidate offices.
+        """
+        min_row, max_row, min_column, max_column = self._extent
+        max_radius = max(abs(row - min_row), abs(row - max_row), abs(column - min_column), abs(column - max_column))
+        found = []
+        for radius in range(max_radius + 1):
+            ring = self._ring(row, column, radius)
+            if not ring:
+                continue
+            found.extend(ring)
+            ids = np.concatenate(found)
+            if delivery_only:
+                ids = ids[self.delivery[ids]]
+            if len(ids) < n:
+                continue
+            # Compare dot products (larger = closer); callers convert only the final n to kilometres
+            positions, dots = self._top_n(ids, queries, n)
+            # Anything outside the searched block is at least `radius` cells away
+            edge_latitude = min(89.0, max_abs_lat + (radius + 1) * GRID_CELL_DEGREES)
+            reach_km = radius * GRID_CELL_DEGREES * _KM_PER_DEGREE * math.cos(math.radians(edge_latitude))
+            if dots[:, -1].min() >= math.cos(reach_km / EARTH_RADIUS_KM):
+                break
+        return positions, dots
+
+    def _candidate_count(self, delivery_only):
+        return self._delivery_count if delivery_only else len(self.offices)
+
+    def nearest(self, lat, lon, n=5, delivery_only=True):
+        """The n nearest offices to (lat, lon) as [(office, distance_km)], nearest first."""
+        n = min(n, self._candidate_count(delivery_only))
+        if n <= 0:
+            return []
+        # Scalar trigonometry: cheaper than NumPy for a single point
+        cos_lat = math.cos(math.radians(lat))
+        query = np.array([[cos_lat * math.cos(math.radians(lon)), cos_lat * math.sin(math.radians(lon)),
+                           math.sin(math.radians(lat))]])
+        row, column = self._cell(lat, lon)
+        positions, dots = self._search(row, column, query, abs(lat), n, delivery_only)
+        return [(self.offices[i], float(km)) for i, km in zip(positions[0].tolist(), chord_to_km(dots[0]))]
+
+    def nearest_many(self, lats, lons, n=1, delivery_only=True):
+        """Nearest offices for many points, searched a grid cell of points at a time.
+
+        Returns (office positions, distances_km), both (len(points), n) arrays;
+        positions index self.offices.
+        """
+        lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+        lons = np.asarray(lons, dtype=np.float64).reshape(-1)
+        n = max(0, min(n, self._candidate_count(delivery_only)))
+        positions = np.empty((len(lats), n), dtype=np.int64)
+        distances = np.empty((len(lats), n), dtype=np.float64)
+        if n == 0 or not len(lats):
+            return positions, distances
+        queries = unit_vectors(lats, lons).reshape(-1, 3)
+        cells = np.stack([np.floor(lats / GRID_CELL_DEGREES), np.floor(lons / GRID_CELL_DEGREES)], axis=1)
+        cells, group = np.unique(cells.astype(np.int64), axis=0, return_inverse=True)
+        group = group.reshape(-1)
+        order = np.argsort(group, kind="stable")
+        bounds = np.searchsorted(group[order], np.arange(len(cells) + 1))
+        for (row, column), start, stop in zip(cells.tolist(), bounds[:-1].tolist(), bounds[1:].tolist()):
+            members = order[start:stop]
+            found, dots = self._search(row, column, queries[members], float(np.abs(lats[members]).max()), n,
+                                       delivery_only)
+            positions[members] = found
+            distances[members] = chord_to_km(dots)
+        return positions, distances
+
+    def nearest_of_pincode(self, lat, lon, pincode):
+        """The office of this pincode nearest to (lat, lon) as (office, distance_km), or None."""
+        ids = self._by_pincode.get(pincode)
+        if ids is None:
+            return None
+        distances = chord_to_km(self.vectors[ids] @ unit_vectors(lat, lon))
+        best = int(np.argmin(distances))
+        return self.offices[ids[best]], float(distances[best])
+
+    def check_location(self, pincode, lat, lon, max_km=MAX_STATION_DISTANCE_KM):
+        """Is the pincode plausible for mail scanned at (lat, lon)?
+
+        consistent is None when the pincode has no geolocated office.
+        """
+        result = {"pincode": pincode, "max_km": max_km}
+        nearest = self.nearest_of_pincode(lat, lon, pincode)
+        if nearest is None:
+            return dict(result, consistent=None, reason="No geolocated office for this PIN code.")
+        office, distance = nearest
+        return dict(result, consistent=distance <= max_km, distance_km=round(distance, 3),
+                    nearest_office=office.post_office)
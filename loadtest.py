@@ -0,0 +1,144 @@
+# Filename: loadtest.py
+#
+# Concurrent load test for the postal API. Either point it at a running
+# server, or let it start uvicorn with each worker count in turn:
+#
+#   python loadtest.py --url http://127.0.0.1:8000 --concurrency 1,16,64
+#   python loadtest.py --workers 1,2,4 --concurrency 64 --duration 15
+#
+# Each uvicorn worker keeps its own in-memory postal index: a write is visible
+# at once in the worker that served it and in the others after their next
+# directory-version poll (POSTAL_INDEX_REFRESH_SECONDS), which reloads their
+# whole index. Write runs with several workers include that reload cost.
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from postal_db import POSTAL_CSV, create_tables, populate_database_from_csv
+from postal_index import percentile
+
+# -------------------------------
+# Load Generation
+# -------------------------------
+
+def load_pincodes(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        pincodes = sorted({row["Pincode"] for row in csv.DictReader(f)})
+    return pincodes + ["000000", "999999"]  # include misses
+
+
+async def _client_loop(client, pincodes, deadline, latencies, errors, write_ratio):
+    while time.perf_counter() < deadline:
+        pincode = random.choice(pincodes)
+        start = time.perf_counter()
+        try:
+            if random.random() < write_ratio:
+                response = await client.post("/add_postal_code", json={
+                    "pincode": pincode, "post_office": "Loadtest BO", "delivery": "Delivery",
+                    "district": "COIMBATORE", "state": "TAMIL NADU",
+                })
+            elif random.random() < 0.5:
+                response = await client.get(f"/postal_code/{pincode}")
+            else:
+                response = await client.post("/validate_pincode", params={"pincode": pincode})
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(str(e))
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(url, concurrency, duration, pincodes, write_ratio=0.0):
+    """Drive the API with `concurrency` clients for `duration` seconds."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, errors = [], []
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _client_loop(client, pincodes, deadline, latencies, errors, write_ratio)
+            for _ in range(concurrency)
+        ))
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+# -------------------------------
+# Server Management
+# -------------------------------
+
+def start_server(workers, port):
+    env = dict(os.environ, POSTAL_INGEST_ON_STARTUP="0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 300  # model loading can take a while
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(url + "/metrics/latency", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Server did not become ready in time.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the postal API.")
+    parser.add_argument("--url", help="Test an already running server instead of starting one.")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated uvicorn worker counts.")
+    parser.add_argument("--concurrency", default="64", help="Comma-separated client concurrency levels.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run.")
+    parser.add_argument("--write-ratio", type=float, default=0.0, help="Fraction of requests that write.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--csv", default=POSTAL_CSV)
+    args = parser.parse_args()
+
+    pincodes = load_pincodes(args.csv)
+    concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    results = []
+
+    if args.url:
+        for concurrency in concurrency_levels:
+            results.append(asyncio.run(run_load(args.url, concurrency, args.duration, pincodes, args.write_ratio)))
+    else:
+        # Ingest once up front so workers do not race on startup
+        create_tables()
+        populate_database_from_csv(args.csv)
+        for workers in worker_counts:
+            process, url = start_server(workers, args.port)
+            try:
+                for concurrency in concurrency_levels:
+                    result = asyncio.run(run_load(url, concurrency, args.duration, pincodes, args.write_ratio))
+                    result["workers"] = workers
+                    results.append(result)
+            finally:
+                process.terminate()
+                process.wait()
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
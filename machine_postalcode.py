@@ -1,12 +1,12 @@
 import requests
 import json
+from pincode_client import get_client
 
 # API Key Interaction
-ENDPOINT = "https://api.postalpincode.in/pincode/"
 pincode = input("Enter your pincode: ")
 
 try:
-    response = requests.get(ENDPOINT + pincode)
+    response = get_client().get(pincode.strip())
     
     # Check if the response is successful
     if response.status_code != 200:
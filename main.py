@@ -1,48 +1,69 @@
 # Filename: main.py
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-import pytesseract
-from PIL import Image
-from transformers import pipeline
-from sqlalchemy import create_engine, Column, String, Integer, Float
-from sqlalchemy.orm import sessionmaker, declarative_base
-import pickle
-import pandas as pd
+from typing import List, Tuple
+import argparse
+import asyncio
+import json
+import os
 import uvicorn
+from postal_index import Office, PostalIndex, IndexHolder, LatencyTracker
+from geo_index import GeoIndex, MAX_STATION_DISTANCE_KM, coordinate_in_range
+from pincode_rules import REASONS, VALID, PincodeValidator
+from postal_db import (AsyncSessionLocal, SessionLocal, POSTAL_CSV, INGEST_CHUNK_SIZE, create_tables,
+                       get_session, all_offices, directory_version, offices_for_pincode, upsert_office,
+                       populate_database_from_csv)
 
 # -------------------------------
 # Configuration and Setup
 # -------------------------------
 
-# Database Configuration
-DATABASE_URL = "sqlite:///./postal_db.db"  # SQLite for simplicity. Change to PostgreSQL if needed.
-
-# Initialize Database
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Define Database Models
-class PostalCode(Base):
-    _tablename_ = 'postal_codes'
-    id = Column(Integer, primary_key=True, index=True)
-    pincode = Column(String, unique=True, index=True, nullable=False)
-    post_office = Column(String, nullable=False)
-    delivery = Column(String, nullable=False)
-    district = Column(String, nullable=False)
-    state = Column(String, nullable=False)
-    latitude = Column(Float, nullable=True)
-    longitude = Column(Float, nullable=True)
+# Whether to ingest the postal directory CSV when the API starts
+INGEST_ON_STARTUP = os.environ.get("POSTAL_INGEST_ON_STARTUP", "1") == "1"
+
+# Each uvicorn worker holds its own in-memory index and applies its own writes at once. Writes made
+# through other workers (or `main.py ingest`) are picked up by polling the database's directory
+# version every this many seconds. 0 disables polling: then run a single worker.
+INDEX_REFRESH_SECONDS = float(os.environ.get("POSTAL_INDEX_REFRESH_SECONDS", "5"))
 
 # Create tables
-Base.metadata.create_all(bind=engine)
+create_tables()
 
 # Initialize FastAPI
 app = FastAPI(title="AI-Powered Postal Delivery System")
 
-# Load NLP Model
-address_parser = pipeline("ner", model="dslim/bert-base-NER", grouped_entities=True)
+# In-memory pincode index, rebuilt from the database at startup and swapped on writes
+postal_index = IndexHolder()
+
+# Directory version the published index reflects
+_index_version = None
+
+# Serializes writes (upsert, read back, publish), so a slower write can never publish offices
+# read before another write committed. Writes are rare; reads never take it.
+_write_lock = asyncio.Lock()
+
+# Upper bound on pincodes accepted by one /validate_pincodes request
+MAX_BATCH_PINCODES = 100000
+
+# Upper bounds for nearest-office queries
+MAX_NEAREST_OFFICES = 100
+MAX_BATCH_POINTS = 100000
+
+# Spatial index over the current postal index (rebuilt off the event loop whenever the index is published)
+_geo_index = None
+
+# Structural PIN code validator with the current index's 3-digit prefixes (rebuilt likewise)
+_pincode_validator = PincodeValidator()
+
+# Per-endpoint request latency (p50/p99)
+latency_tracker = LatencyTracker()
+
+# Latency key of requests that match no route (404s)
+UNMATCHED_ROUTE_KEY = "unmatched"
 
 # -------------------------------
 # Pydantic Models for API
@@ -65,121 +86,299 @@ class UpdatePostalCodeInput(BaseModel):
     latitude: float = None
     longitude: float = None
 
+class NearestOfficesInput(BaseModel):
+    points: List[Tuple[float, float]]  # (latitude, longitude)
+    n: int = 1
+    delivery_only: bool = True
+
 # -------------------------------
 # Utility Functions
 # -------------------------------
 
-def populate_database_from_csv(csv_path: str):
-    """Populate the database with postal data from the given CSV."""
+def _read_postal_index():
+    """(directory version, PostalIndex with its derived indexes) from the database (blocking)."""
     db = SessionLocal()
     try:
-        data = pd.read_csv(csv_path)
-        for _, row in data.iterrows():
-            existing_entry = db.query(PostalCode).filter(PostalCode.pincode == str(row['Pincode'])).first()
-            if not existing_entry:
-                entry = PostalCode(
-                    pincode=str(row['Pincode']),
-                    post_office=row['OfficeNam'],
-                    delivery=row['Delivery'],
-                    district=row['District'],
-                    state=row['StateNam'],
-                    latitude=row['Latitude'],
-                    longitude=row['Longitude']
-                )
-                db.add(entry)
-        db.commit()
+        # Version first: a write landing in between only causes one extra reload
+        version = directory_version(db)
+        offices = all_offices(db)
     finally:
         db.close()
-    print("Database populated from CSV.")
+    return version, _with_derived_indexes(PostalIndex(offices))
+
+async def load_postal_index():
+    """Rebuild the in-memory pincode index from the database and publish it."""
+    global _index_version
+    version, index = await run_in_threadpool(_read_postal_index)
+    postal_index.replace(index)
+    _index_version = version
+    print(f"Postal index loaded: {len(index)} offices.")
+    return index
+
+async def refresh_postal_index():
+    """Reload the index whenever the directory version moves past the one it reflects."""
+    while True:
+        await asyncio.sleep(INDEX_REFRESH_SECONDS)
+        try:
+            async with AsyncSessionLocal() as session:
+                version = await session.run_sync(directory_version)
+            if version != _index_version:
+                async with _write_lock:
+                    await load_postal_index()
+        except Exception as e:
+            print(f"Postal index refresh failed: {e}")
 
-def validate_pincode(pincode: str, db_session):
-    """Validate PIN code against the database."""
-    postal_entry = db_session.query(PostalCode).filter(PostalCode.pincode == pincode).first()
+def validate_pincode(pincode: str):
+    """Validate PIN code against the in-memory postal index."""
+    if current_pincode_validator().check_one(pincode) != VALID:
+        return False, None
+    postal_entry = postal_index.current.first(pincode)
     if postal_entry:
         return True, postal_entry
     else:
         return False, None
 
+def _with_derived_indexes(index):
+    """Build the GeoIndex and prefix validator for an index about to be published (blocking).
+
+    Called from the threadpool step that publishes the index, so queries never rebuild them on the event loop.
+    """
+    global _geo_index, _pincode_validator
+    geo = GeoIndex.from_index(index)
+    validator = PincodeValidator.from_index(index) if len(index) else PincodeValidator()
+    _geo_index, _pincode_validator = geo, validator
+    return index
+
+def current_geo_index():
+    """GeoIndex for the current postal index snapshot."""
+    global _geo_index
+    if _geo_index is None:
+        _geo_index = GeoIndex.from_index(postal_index.current)
+    return _geo_index
+
+def current_pincode_validator():
+    """PincodeValidator with the prefixes of the current postal index snapshot."""
+    return _pincode_validator
+
+def _check_coordinate(lat, lon):
+    if not coordinate_in_range(lat, lon):
+        raise HTTPException(status_code=400, detail="Latitude must be within [-90, 90] and longitude within [-180, 180].")
+
+def _office_with_distance(office, distance_km):
+    return dict(office.as_dict(), distance_km=round(distance_km, 3))
+
+def _pincode_from_item(item):
+    """Accept "641104", 641104 or {"pincode": "641104"} as a batch item."""
+    if isinstance(item, dict):
+        item = item.get("pincode")
+    if item is None:
+        return None
+    return str(item).strip()
+
+async def _read_ndjson_pincodes(request: Request):
+    """Yield pincodes from an NDJSON request body as it streams in."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _pincode_from_item(json.loads(line))
+    if buffer.strip():
+        yield _pincode_from_item(json.loads(buffer))
+
+def _batch_result_lines(pincodes):
+    """Resolve unique pincodes against a single index snapshot, one NDJSON line each.
+
+    The whole batch is checked structurally first; only well-formed pincodes are looked up.
+    """
+    index = postal_index.current
+    statuses = current_pincode_validator().check(pincodes)
+    for pincode, status in zip(pincodes, statuses.tolist()):
+        if status != VALID:
+            yield json.dumps({"pincode": pincode, "valid": False, "reason": REASONS[status]}) + "\n"
+            continue
+        offices = index.lookup(pincode)
+        if offices:
+            result = {"pincode": pincode, "valid": True, "post_office": offices[0].post_office,
+                      "delivery": offices[0].delivery, "offices": len(offices)}
+        else:
+            result = {"pincode": pincode, "valid": False}
+        yield json.dumps(result) + "\n"
+
 # -------------------------------
 # API Endpoints
 # -------------------------------
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    """Record the handling time of every request, keyed by route template.
+
+    Requests matching no route share one key, so arbitrary paths cannot add keys.
+    """
+    with latency_tracker.time(UNMATCHED_ROUTE_KEY) as timer:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            timer.key = request.method + " " + route.path
+    return response
+
 @app.on_event("startup")
 async def startup_event():
-    """Populate the database with initial data from the CSV."""
-    populate_database_from_csv("coimbature_df.csv")  # Ensure the dataset file is available.
+    """Populate the database with initial data from the CSV and build the lookup index."""
+    if INGEST_ON_STARTUP:
+        # Bulk ingest is synchronous; keep it off the event loop
+        await run_in_threadpool(populate_database_from_csv, POSTAL_CSV)  # Ensure the dataset file is available.
+    await load_postal_index()
+    if INDEX_REFRESH_SECONDS > 0:
+        app.state.index_refresh = asyncio.create_task(refresh_postal_index())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop polling for directory changes."""
+    task = getattr(app.state, "index_refresh", None)
+    if task is not None:
+        task.cancel()
+
+@app.get("/metrics/latency")
+async def latency_metrics():
+    """Report p50/p99 request latency per endpoint."""
+    return latency_tracker.summary()
 
 @app.post("/validate_pincode", response_model=ValidationResponse)
 async def validate_pincode_endpoint(pincode: str):
     """Endpoint to validate a PIN code."""
+    is_valid, postal_entry = validate_pincode(pincode)
+    if not is_valid:
+        raise HTTPException(status_code=404, detail="PIN code not found.")
+    return {
+        "valid": True,
+        "post_office": postal_entry.post_office,
+        "delivery": postal_entry.delivery
+    }
+
+@app.post("/validate_pincodes")
+async def validate_pincodes_endpoint(request: Request):
+    """Validate many PIN codes at once.
+
+    The body is either a JSON array or an NDJSON stream
+    (Content-Type: application/x-ndjson). Duplicates are dropped and the
+    results are streamed back as NDJSON, one line per unique PIN code.
+    """
+    seen = {}
     try:
-        db = SessionLocal()
-        is_valid, postal_entry = validate_pincode(pincode, db)
-        db.close()
-        if not is_valid:
-            raise HTTPException(status_code=404, detail="PIN code not found.")
-        return {
-            "valid": True,
-            "post_office": postal_entry.post_office,
-            "delivery": postal_entry.delivery
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            async for pincode in _read_ndjson_pincodes(request):
+                if pincode:
+                    seen[pincode] = None
+                if len(seen) > MAX_BATCH_PINCODES:
+                    break
+        else:
+            items = json.loads(await request.body())
+            if not isinstance(items, list):
+                raise HTTPException(status_code=400, detail="Expected a JSON array of PIN codes.")
+            for item in items:
+                pincode = _pincode_from_item(item)
+                if pincode:
+                    seen[pincode] = None
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if len(seen) > MAX_BATCH_PINCODES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_PINCODES} PIN codes per request.")
+    return StreamingResponse(_batch_result_lines(list(seen)), media_type="application/x-ndjson")
 
 @app.post("/add_postal_code")
-async def add_postal_code(input: UpdatePostalCodeInput):
-    """Endpoint to add or update a postal code in the database."""
+async def add_postal_code(input: UpdatePostalCodeInput, db: AsyncSession = Depends(get_session)):
+    """Endpoint to add or update a post office under a postal code."""
+    office = Office(input.pincode, input.post_office, input.delivery, input.district,
+                    input.state, input.latitude, input.longitude)
+    global _index_version
     try:
-        db = SessionLocal()
-        existing_entry = db.query(PostalCode).filter(PostalCode.pincode == input.pincode).first()
-        if existing_entry:
-            existing_entry.post_office = input.post_office
-            existing_entry.delivery = input.delivery
-            existing_entry.district = input.district
-            existing_entry.state = input.state
-            existing_entry.latitude = input.latitude
-            existing_entry.longitude = input.longitude
-        else:
-            new_entry = PostalCode(
-                pincode=input.pincode,
-                post_office=input.post_office,
-                delivery=input.delivery,
-                district=input.district,
-                state=input.state,
-                latitude=input.latitude,
-                longitude=input.longitude
-            )
-            db.add(new_entry)
-        db.commit()
-        db.close()
+        async with _write_lock:
+            await db.run_sync(upsert_office, office)
+            offices = await db.run_sync(offices_for_pincode, office.pincode)
+            version = await db.run_sync(directory_version)
+            # Splicing the index and rebuilding the indexes derived from it are CPU-bound; keep them off the event loop
+            await run_in_threadpool(postal_index.update,
+                                    lambda index: _with_derived_indexes(index.with_pincode(office.pincode, offices)))
+            # Only this write happened since the last load: the spliced index is current. Otherwise
+            # another worker wrote too, and the next refresh reloads everything.
+            if _index_version is not None and version == _index_version + 1:
+                _index_version = version
         return {"message": "Postal code added/updated successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/offices/nearest")
+async def nearest_offices(lat: float, lon: float, n: int = 5, delivery_only: bool = True):
+    """The n post offices nearest to a coordinate, nearest first."""
+    _check_coordinate(lat, lon)
+    if not 1 <= n <= MAX_NEAREST_OFFICES:
+        raise HTTPException(status_code=400, detail=f"n must be between 1 and {MAX_NEAREST_OFFICES}.")
+    nearest = current_geo_index().nearest(lat, lon, n, delivery_only)
+    return {"lat": lat, "lon": lon, "offices": [_office_with_distance(o, d) for o, d in nearest]}
+
+@app.post("/offices/nearest")
+async def nearest_offices_bulk(input: NearestOfficesInput):
+    """Nearest offices for many points at once (route planning), vectorized over all points."""
+    if len(input.points) > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_POINTS} points per request.")
+    if not 1 <= input.n <= MAX_NEAREST_OFFICES:
+        raise HTTPException(status_code=400, detail=f"n must be between 1 and {MAX_NEAREST_OFFICES}.")
+    for lat, lon in input.points:
+        _check_coordinate(lat, lon)
+    geo = current_geo_index()
+    if not input.points:
+        return {"results": []}
+    lats, lons = zip(*input.points)
+    positions, distances = await run_in_threadpool(geo.nearest_many, lats, lons, input.n, input.delivery_only)
+    return {"results": [
+        {"lat": lat, "lon": lon,
+         "offices": [_office_with_distance(geo.offices[i], d) for i, d in zip(row, row_distances)]}
+        for (lat, lon), row, row_distances in zip(input.points, positions.tolist(), distances.tolist())
+    ]}
+
+@app.get("/validate_location")
+async def validate_location(pincode: str, lat: float, lon: float, max_km: float = MAX_STATION_DISTANCE_KM):
+    """Check that a scanned PIN code is plausible for the scanning station's location."""
+    _check_coordinate(lat, lon)
+    if pincode not in postal_index.current:
+        raise HTTPException(status_code=404, detail="PIN code not found.")
+    return current_geo_index().check_location(pincode, lat, lon, max_km)
+
 @app.get("/postal_code/{pincode}")
 async def get_postal_code_info(pincode: str):
-    """Get details of a postal code."""
-    try:
-        db = SessionLocal()
-        postal_entry = db.query(PostalCode).filter(PostalCode.pincode == pincode).first()
-        db.close()
-        if not postal_entry:
-            raise HTTPException(status_code=404, detail="Postal code not found.")
-        return {
-            "pincode": postal_entry.pincode,
-            "post_office": postal_entry.post_office,
-            "delivery": postal_entry.delivery,
-            "district": postal_entry.district,
-            "state": postal_entry.state,
-            "latitude": postal_entry.latitude,
-            "longitude": postal_entry.longitude
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """Get details of a postal code and every post office it serves."""
+    offices = postal_index.current.lookup(pincode)
+    if not offices:
+        raise HTTPException(status_code=404, detail="Postal code not found.")
+    return {"pincode": pincode, "offices": [office.as_dict() for office in offices]}
+
+@app.get("/office/{office_name}/pincodes")
+async def get_office_pincodes(office_name: str):
+    """Reverse lookup: pincodes served by post offices with the given name."""
+    pincodes = postal_index.current.pincodes_for_office(office_name)
+    if not pincodes:
+        raise HTTPException(status_code=404, detail="Post office not found.")
+    return {"office": office_name, "pincodes": list(pincodes)}
 
 # -------------------------------
 # Run the Application
 # -------------------------------
 
-if _name_ == "_main_":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI-Powered Postal Delivery System")
+    subcommands = parser.add_subparsers(dest="command")
+    serve_parser = subcommands.add_parser("serve", help="Run the API server (default).")
+    serve_parser.add_argument("--skip-ingest", action="store_true", help="Do not load the CSV on startup.")
+    ingest_parser = subcommands.add_parser("ingest", help="Bulk-load a postal directory CSV into the database.")
+    ingest_parser.add_argument("csv_path", nargs="?", default=POSTAL_CSV)
+    ingest_parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        populate_database_from_csv(args.csv_path, chunk_size=args.chunk_size)
+    else:
+        if getattr(args, "skip_ingest", False):
+            os.environ["POSTAL_INGEST_ON_STARTUP"] = "0"  # inherited by the reload worker
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,207 @@
+# Filename: ner_service.py
+
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Default model for address parsing
+NER_MODEL = os.environ.get("NER_MODEL", "dslim/bert-base-NER")
+
+# Inference backend: "torch" (default), "quantized" (dynamic int8) or "onnx" (ONNX Runtime)
+NER_BACKEND = os.environ.get("NER_BACKEND", "torch")
+NER_BACKENDS = ("torch", "quantized", "onnx")
+
+# Where exported ONNX models are kept between runs
+ONNX_CACHE_DIR = os.environ.get("NER_ONNX_CACHE_DIR", "onnx_models")
+
+# Dynamic batching limits
+MAX_BATCH_SIZE = int(os.environ.get("NER_MAX_BATCH_SIZE", "32"))
+MAX_WAIT_SECONDS = float(os.environ.get("NER_MAX_WAIT_MS", "10")) / 1000.0
+
+# PIN code (6-digit number)
+PINCODE_PATTERN = re.compile(r'\b\d{6}\b')
+
+# -------------------------------
+# Address Parsing Helpers
+# -------------------------------
+
+def extract_pincode(address):
+    """Extract PIN code (6-digit number) from the address using regex."""
+    match = PINCODE_PATTERN.search(address)
+    return match.group(0) if match else None
+
+
+def group_entities(entities):
+    """Collect pipeline output into {entity type: [words]}."""
+    parsed = {}
+    for entity in entities:
+        entity_type = entity.get('entity', entity.get('entity_group'))
+        parsed.setdefault(entity_type, []).append(entity['word'])
+    return parsed
+
+# -------------------------------
+# Backend Loading
+# -------------------------------
+
+def _load_quantized(model, **pipeline_kwargs):
+    """Dynamic int8 quantization of the model's Linear layers (CPU only)."""
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(pipeline_kwargs.pop("tokenizer", model))
+    float_model = AutoModelForTokenClassification.from_pretrained(model)
+    quantized = torch.quantization.quantize_dynamic(float_model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("ner", model=quantized, tokenizer=tokenizer, device=-1, **pipeline_kwargs)
+
+
+def _load_onnx(model, **pipeline_kwargs):
+    """ONNX Runtime model, exported once and reused from ONNX_CACHE_DIR."""
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer, pipeline
+
+    tokenizer_name = pipeline_kwargs.pop("tokenizer", model)
+    export_dir = os.path.join(ONNX_CACHE_DIR, model.replace("/", "__"))
+    if os.path.isdir(export_dir):
+        ort_model = ORTModelForTokenClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        ort_model = ORTModelForTokenClassification.from_pretrained(model, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        ort_model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+        logging.info(f"Exported {model} to ONNX at {export_dir}.")
+    return pipeline("ner", model=ort_model, tokenizer=tokenizer, **pipeline_kwargs)
+
+
+def load_ner_pipeline(model, backend="torch", **pipeline_kwargs):
+    """Build a transformers NER pipeline for the requested backend."""
+    if backend == "torch":
+        from transformers import pipeline
+
+        return pipeline("ner", model=model, **pipeline_kwargs)
+    if backend == "quantized":
+        return _load_quantized(model, **pipeline_kwargs)
+    if backend == "onnx":
+        return _load_onnx(model, **pipeline_kwargs)
+    raise ValueError(f"Unknown NER backend {backend!r}; expected one of {NER_BACKENDS}.")
+
+# -------------------------------
+# Shared NER Service
+# -------------------------------
+
+class NerService:
+    """A transformers NER pipeline that is loaded on first use and shared.
+
+    parse_addresses() runs one batched pipeline call for a list of
+    addresses. submit() queues a single address for a background batcher
+    that groups concurrent callers into batches of up to max_batch_size,
+    waiting at most max_wait seconds for a batch to fill.
+    """
+
+    def __init__(self, model=NER_MODEL, backend=NER_BACKEND, max_batch_size=MAX_BATCH_SIZE,
+                 max_wait=MAX_WAIT_SECONDS, **pipeline_kwargs):
+        self.model = model
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.pipeline_kwargs = pipeline_kwargs
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+        self._queue = None
+        self._batcher = None
+
+    @property
+    def pipeline(self):
+        if self._pipeline is None:
+            with self._load_lock:
+                if self._pipeline is None:
+                    start = time.perf_counter()
+                    self._pipeline = load_ner_pipeline(self.model, self.backend, **self.pipeline_kwargs)
+                    logging.info(f"Loaded NER model {self.model} ({self.backend}) "
+                                 f"in {time.perf_counter() - start:.1f}s.")
+        return self._pipeline
+
+    def __call__(self, text):
+        """Raw pipeline output, so the service can stand in for a transformers pipeline."""
+        return self.pipeline(text)
+
+    def entities(self, addresses, batch_size=None):
+        """Raw entity lists for a list of addresses, inferred in batches."""
+        if not addresses:
+            return []
+        return self.pipeline(list(addresses), batch_size=batch_size or self.max_batch_size)
+
+    def parse_addresses(self, addresses, batch_size=None):
+        """Parse many addresses at once. Returns a list of (parsed components, pincode)."""
+        return [
+            (group_entities(entities), extract_pincode(address))
+            for address, entities in zip(addresses, self.entities(addresses, batch_size))
+        ]
+
+    def parse_address(self, address):
+        """Parse the given address using NLP and detect potential PIN code."""
+        return self.parse_addresses([address])[0]
+
+    # Dynamic batching for concurrent callers
+
+    def submit(self, address):
+        """Queue one address for batched parsing. Returns a Future of (parsed, pincode)."""
+        if self._batcher is None:
+            with self._load_lock:
+                if self._batcher is None:
+                    self._queue = queue.Queue()
+                    self._batcher = threading.Thread(target=self._batch_loop, name="ner-batcher", daemon=True)
+                    self._batcher.start()
+        future = Future()
+        self._queue.put((address, future))
+        return future
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            addresses = [address for address, _ in batch]
+            try:
+                results = self.parse_addresses(addresses, batch_size=len(batch))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+def get_ner_service(model=NER_MODEL, backend=None, **pipeline_kwargs):
+    """Process-wide NerService for a model, backend and pipeline options (the model loads lazily).
+
+    The backend defaults to NER_BACKEND, so stations can switch to the
+    quantized or ONNX path by configuration alone.
+    """
+    backend = backend or NER_BACKEND
+    key = (model, backend, tuple(sorted(pipeline_kwargs.items())))
+    service = _services.get(key)
+    if service is None:
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = _services[key] = NerService(model, backend, **pipeline_kwargs)
+    return service
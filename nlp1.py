@@ -1,7 +1,7 @@
-from transformers import pipeline
+from ner_service import get_ner_service
 
-# Load pretrained NLP model
-address_parser = pipeline("ner", model="dslim/bert-base-NER")
+# Load pretrained NLP model (shared, loaded on first use)
+address_parser = get_ner_service("dslim/bert-base-NER")
 
 # Example address
 address = "123 MG Road, Bangalore, Karnataka, 560001"
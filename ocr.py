@@ -1,15 +1,23 @@
+import sys
 import cv2
-import easyocr
-from deep_translator import GoogleTranslator
+from translation import get_translator
+from auto_capture import FrameGate
+from ocr_engines import create_reader
 
 # Initialize EasyOCR with English and Tamil
 try:
-    reader = easyocr.Reader(['en'], gpu=False)
+    # Frames are grayscaled and scaled to a target text height first (OCR_PREPROCESS selects the preset);
+    # Tesseract is tried first and EasyOCR takes over when its confidence is low (OCR_ENGINES)
+    reader = create_reader(['en'])
+    reader.load()
 except RuntimeError:
     print("There was an issue loading the language model. Try updating EasyOCR or re-installing.")
 
-# Initialize the translator for English translation
-translator = GoogleTranslator(source='auto', target='en')
+# Translator for English: Latin text is passed through, Indic phrases are cached or transliterated offline
+translator = get_translator()
+
+# Auto-capture mode ("python ocr.py --auto"): recognize each new, steady, in-focus envelope without pressing 'c'
+frame_gate = FrameGate() if "--auto" in sys.argv else None
 
 # Open the camera
 cap = cv2.VideoCapture(0)
@@ -24,8 +32,8 @@ while True:
     # Wait for the key press
     key = cv2.waitKey(1) & 0xFF
 
-    # Check if the 'c' key was pressed for capturing
-    if key == ord('c'):
+    # Check if the 'c' key was pressed for capturing (or the auto-capture gate fired)
+    if key == ord('c') or (frame_gate is not None and frame_gate.should_capture(frame)):
         # Detect and recognize text in the captured frame
         try:
             result = reader.readtext(frame)
@@ -71,3 +79,7 @@ while True:
 # Release the camera and close all windows
 cap.release()
 cv2.destroyAllWindows()
+if frame_gate is not None:
+    print("Auto-capture frames:", frame_gate.stats())
+print("OCR engines:", reader.stats())
+print("Translation:", translator.stats())
@@ -0,0 +1,239 @@
+# Filename: ocr_engines.py
+
+import importlib.util
+import logging
+import os
+import shutil
+
+from address_roi import ROI_MODE, AddressBlockReader, log_roi_stats
+from ner_service import extract_pincode
+from ocr_preprocess import PREPROCESS_PRESET, PreprocessingReader
+from postal_index import LatencyTracker
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Engines tried in order, cheapest first; later engines run only when earlier results are not trusted
+OCR_ENGINES = os.environ.get("OCR_ENGINES", "tesseract,easyocr").split(",")
+
+# Mean recognition confidence (0-1) below which the next engine is tried
+MIN_CONFIDENCE = float(os.environ.get("OCR_MIN_CONFIDENCE", "0.6"))
+
+# Tesseract binary; defaults to whatever "tesseract" is on PATH
+TESSERACT_CMD = os.environ.get("TESSERACT_CMD", "tesseract")
+
+# Single uniform block of text: suits a printed address label
+TESSERACT_CONFIG = os.environ.get("TESSERACT_CONFIG", "--oem 3 --psm 6")
+
+# EasyOCR language codes -> Tesseract traineddata names
+TESSERACT_LANGUAGES = {
+    "en": "eng", "ta": "tam", "hi": "hin", "te": "tel", "kn": "kan", "ml": "mal",
+    "bn": "ben", "mr": "mar", "gu": "guj", "pa": "pan", "or": "ori",
+}
+
+# -------------------------------
+# Engines
+# -------------------------------
+
+class OcrEngine:
+    """Common interface: readtext(image) -> [(4-point box, text, confidence 0-1)], as EasyOCR returns."""
+
+    name = "base"
+
+    def is_available(self):
+        return True
+
+    def load(self):
+        """Load models ahead of the first image (no-op for engines without any)."""
+
+    def readtext(self, image, **kwargs):
+        raise NotImplementedError
+
+
+class EasyOcrEngine(OcrEngine):
+    """EasyOCR, recognizing only the address block (see address_roi). The reader loads on first use."""
+
+    name = "easyocr"
+
+    def __init__(self, languages=("en",), roi_mode=ROI_MODE, reader=None):
+        self.languages = list(languages)
+        self.roi_mode = roi_mode
+        self._reader = reader
+
+    def is_available(self):
+        return self._reader is not None or importlib.util.find_spec("easyocr") is not None
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            import easyocr
+
+            self._reader = AddressBlockReader(easyocr.Reader(self.languages, gpu=False), self.roi_mode)
+        return self._reader
+
+    def load(self):
+        return self.reader
+
+    def readtext(self, image, **kwargs):
+        return [(box, text, float(confidence)) for box, text, confidence in self.reader.readtext(image, **kwargs)]
+
+
+class TesseractEngine(OcrEngine):
+    """Tesseract via pytesseract, with words grouped into lines to match EasyOCR's output."""
+
+    name = "tesseract"
+
+    def __init__(self, languages=("en",), config=TESSERACT_CONFIG, cmd=TESSERACT_CMD):
+        self.lang = "+".join(TESSERACT_LANGUAGES.get(language, language) for language in languages)
+        self.config = config
+        self.cmd = cmd
+
+    def is_available(self):
+        if importlib.util.find_spec("pytesseract") is None:
+            return False
+        return shutil.which(self.cmd) is not None or os.path.isfile(self.cmd)
+
+    def readtext(self, image, **kwargs):
+        import pytesseract
+
+        pytesseract.pytesseract.tesseract_cmd = self.cmd
+        data = pytesseract.image_to_data(image, lang=self.lang, config=self.config,
+                                         output_type=pytesseract.Output.DICT)
+        lines = {}
+        for i, word in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if confidence < 0 or not word.strip():
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(i)
+        detections = []
+        for key in sorted(lines):
+            words = lines[key]
+            x0 = min(data["left"][i] for i in words)
+            y0 = min(data["top"][i] for i in words)
+            x1 = max(data["left"][i] + data["width"][i] for i in words)
+            y1 = max(data["top"][i] + data["height"][i] for i in words)
+            text = " ".join(data["text"][i].strip() for i in words)
+            confidence = sum(float(data["conf"][i]) for i in words) / len(words) / 100.0
+            detections.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, confidence))
+        return detections
+
+
+ENGINE_TYPES = {"easyocr": EasyOcrEngine, "tesseract": TesseractEngine}
+
+# -------------------------------
+# Router
+# -------------------------------
+
+def mean_confidence(detections):
+    """Confidence averaged over characters, so one confident short word cannot carry a page."""
+    total = sum(len(text) for _, text, _ in detections)
+    if not total:
+        return 0.0
+    return sum(len(text) * confidence for _, text, confidence in detections) / total
+
+
+class OcrRouter:
+    """Runs the cheapest engine first and escalates when its result is not trusted.
+
+    A result is trusted when its mean confidence reaches min_confidence and
+    (with require_pincode) it contains a PIN code. The last engine's result
+    is always returned. Per engine it tracks calls, acceptances, escalations,
+    latency, mean confidence and, when an escalated image had a PIN code
+    from both engines, how often the two agreed.
+    """
+
+    def __init__(self, engines, min_confidence=MIN_CONFIDENCE, require_pincode=True):
+        if not engines:
+            raise ValueError("OcrRouter needs at least one engine.")
+        self.engines = list(engines)
+        self.min_confidence = min_confidence
+        self.require_pincode = require_pincode
+        self.latency = LatencyTracker()
+        self.counters = {engine.name: {"calls": 0, "accepted": 0, "escalated": 0, "errors": 0,
+                                       "confidence_sum": 0.0, "pincode_compared": 0, "pincode_agreed": 0}
+                         for engine in self.engines}
+
+    def load(self):
+        for engine in self.engines:
+            engine.load()
+
+    def readtext(self, image, **kwargs):
+        escalated = []  # (engine name, pincode) of untrusted results so far
+        for position, engine in enumerate(self.engines):
+            last = position == len(self.engines) - 1
+            counters = self.counters[engine.name]
+            counters["calls"] += 1
+            try:
+                with self.latency.time(engine.name):
+                    detections = engine.readtext(image, **kwargs)
+            except Exception as e:
+                counters["errors"] += 1
+                logging.error(f"OCR engine {engine.name} failed: {e}")
+                if last:
+                    raise
+                continue
+            confidence = mean_confidence(detections)
+            counters["confidence_sum"] += confidence
+            pincode = extract_pincode(" ".join(text for _, text, _ in detections))
+            for name, earlier_pincode in escalated:
+                if earlier_pincode and pincode:
+                    self.counters[name]["pincode_compared"] += 1
+                    self.counters[name]["pincode_agreed"] += earlier_pincode == pincode
+            trusted = confidence >= self.min_confidence and (pincode or not self.require_pincode)
+            if trusted or last:
+                counters["accepted"] += 1
+                return detections
+            counters["escalated"] += 1
+            escalated.append((engine.name, pincode))
+        return []
+
+    def stats(self):
+        latency = self.latency.summary()
+        stats = {}
+        for name, counters in self.counters.items():
+            calls = counters["calls"] - counters["errors"]
+            stats[name] = {
+                "calls": counters["calls"],
+                "accepted": counters["accepted"],
+                "escalated": counters["escalated"],
+                "errors": counters["errors"],
+                "mean_confidence": round(counters["confidence_sum"] / calls, 3) if calls else None,
+                "pincode_agreement": (round(counters["pincode_agreed"] / counters["pincode_compared"], 3)
+                                      if counters["pincode_compared"] else None),
+                **latency.get(name, {}),
+            }
+        return stats
+
+
+def create_engines(languages=("en",), names=OCR_ENGINES, roi_mode=ROI_MODE):
+    """Available engines among `names`, in order."""
+    engines = []
+    for name in names:
+        name = name.strip()
+        if name not in ENGINE_TYPES:
+            raise ValueError(f"Unknown OCR engine {name!r}; expected one of {sorted(ENGINE_TYPES)}.")
+        engine = EasyOcrEngine(languages, roi_mode) if name == "easyocr" else ENGINE_TYPES[name](languages)
+        if engine.is_available():
+            engines.append(engine)
+        else:
+            logging.warning(f"OCR engine {name} is not installed; skipping it.")
+    return engines
+
+
+def create_reader(languages=("en",), engines=OCR_ENGINES, roi_mode=ROI_MODE, preprocess=PREPROCESS_PRESET):
+    """Preprocessing in front of an engine router: the reader every OCR entry point uses."""
+    return PreprocessingReader(OcrRouter(create_engines(languages, engines, roi_mode)), preprocess)
+
+
+def log_ocr_stats(reader):
+    """Log router and address-block statistics for a reader built by create_reader."""
+    router = vars(reader).get("reader", reader)
+    if not isinstance(router, OcrRouter):
+        log_roi_stats(router)
+        return
+    logging.info(f"OCR engines: {router.stats()}")
+    for engine in router.engines:
+        if isinstance(engine, EasyOcrEngine) and engine._reader is not None:
+            log_roi_stats(engine._reader)
@@ -1,7 +1,7 @@
-from transformers import pipeline
+from ner_service import get_ner_service
 
-# Load the IndicNER model for NER task
-nlp = pipeline("ner", model="ai4bharat/IndicNER", tokenizer="ai4bharat/IndicNER")
+# Load the IndicNER model for NER task (backend chosen by NER_BACKEND)
+nlp = get_ner_service("ai4bharat/IndicNER", tokenizer="ai4bharat/IndicNER")
 
 # Sample Tamil text
 text = "சென்னையில் பள்ளிகளும் கல்லூரிகளும் திறக்கப்படுகின்றன."
@@ -0,0 +1,155 @@
+# Filename: ocr_pipeline.py
+
+import json
+import logging
+import time
+
+import requests
+
+from fuzzy_index import FuzzyPlaceIndex, api_place_names, best_match
+from pincode_client import preprocess_response
+
+# -------------------------------
+# OCR -> Translate -> Parse -> Validate
+# -------------------------------
+
+def detections_to_text(result):
+    """Join EasyOCR detections ([box, text, confidence]) into one paragraph."""
+    return " ".join(detection[1] for detection in result)
+
+
+def validate_address(pincode, scanned_text, resolver, places=None):
+    """Look up the PIN code and check its places against the scanned text.
+
+    The office, district, division and region names of every office under
+    the PIN code are fuzzy-matched against the text (see fuzzy_index), so
+    OCR slips and multi-word regions still match. When nothing matches and
+    a place index is given, the offices the text does name are suggested.
+
+    Returns a JSON-friendly dict rather than a message string, so batch
+    results can be filtered and aggregated.
+    """
+    try:
+        response = resolver.get(pincode)
+    except requests.RequestException as e:
+        return {"valid": False, "error": f"Network or API issue. {e}"}
+    if response.status_code != 200:
+        return {"valid": False, "error": f"HTTP Status Code {response.status_code}"}
+    status = preprocess_response(response.text)
+    if status != "ValidResponse":
+        return {"valid": False, "error": status}
+    post_offices = json.loads(response.text)[0]["PostOffice"]
+    office = post_offices[0]
+    match = best_match(api_place_names(post_offices), scanned_text)
+    result = {
+        "valid": True,
+        "post_office": office.get("Name"),
+        "district": office.get("District"),
+        "region": (office.get("Region") or "").lower(),
+        "region_match": match is not None,
+        "place_match": {"kind": match.kind, "name": match.name, "score": match.score, "text": match.text}
+        if match else None,
+    }
+    if match is None and places is not None:
+        suggested = places.search(scanned_text, limit=3, kinds={"office"})
+        result["suggested_pincodes"] = sorted({pin for place in suggested for pin in place.pincodes})
+    return result
+
+
+class OcrPipeline:
+    """The scan -> validate pipeline from new.py, without the camera loop.
+
+    Heavy components (OCR reader, translator, NER) are created on first
+    use, so a pipeline can be built cheaply and handed to worker code. A
+    reader created here preprocesses each image (see ocr_preprocess) and
+    routes it through the configured OCR engines (see ocr_engines);
+    roi_mode and preprocess default to OCR_ROI_MODE and OCR_PREPROCESS.
+    """
+
+    def __init__(self, reader=None, translator=None, parser=None, resolver=None, languages=("en",),
+                 roi_mode=None, preprocess=None):
+        self._reader = reader
+        self.roi_mode = roi_mode
+        self.preprocess = preprocess
+        self._translator = translator
+        self._parser = parser
+        self._resolver = resolver
+        self._places = None
+        self.languages = list(languages)
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            # Imported here: the OCR stack pulls in cv2 and numpy
+            from address_roi import ROI_MODE
+            from ocr_engines import create_reader
+            from ocr_preprocess import PREPROCESS_PRESET
+
+            self._reader = create_reader(self.languages, roi_mode=self.roi_mode or ROI_MODE,
+                                         preprocess=self.preprocess or PREPROCESS_PRESET)
+        return self._reader
+
+    @property
+    def translator(self):
+        if self._translator is None:
+            from translation import get_translator
+
+            self._translator = get_translator()
+        return self._translator
+
+    @property
+    def parser(self):
+        if self._parser is None:
+            from ner_service import get_ner_service
+            from tiered_parser import get_tiered_parser
+
+            self._parser = get_tiered_parser(get_ner_service("dslim/bert-base-NER"))
+        return self._parser
+
+    @property
+    def resolver(self):
+        if self._resolver is None:
+            from pincode_resolver import get_resolver
+
+            self._resolver = get_resolver()
+        return self._resolver
+
+    @property
+    def places(self):
+        """Fuzzy place index over the resolver's local directory (None without one)."""
+        if self._places is None:
+            directory = getattr(self.resolver, "directory", None)
+            if directory is not None and len(directory):
+                self._places = FuzzyPlaceIndex.from_index(directory)
+        return self._places
+
+    def read_text(self, image_rgb):
+        """Run OCR on an RGB image. Returns (box, text, confidence) detections."""
+        return self.reader.readtext(image_rgb)
+
+    def enrich(self, text):
+        """Translate, parse and validate recognized text."""
+        result = {"text": text}
+        try:
+            result["translated"] = self.translator.translate(text) if text.strip() else text
+        except Exception as e:
+            logging.error(f"Error translating text: {e}")
+            result["translated"] = text
+            result["translate_error"] = str(e)
+        parsed, pincode = self.parser.parse(result["translated"])
+        result["parsed"] = parsed
+        result["pincode"] = pincode
+        if pincode:
+            result["validation"] = validate_address(pincode, result["translated"], self.resolver, self.places)
+        return result
+
+    def process(self, image_rgb):
+        """Full pipeline for one RGB image. Returns a dict with per-stage output and timing."""
+        start = time.perf_counter()
+        detections = self.read_text(image_rgb)
+        ocr_seconds = time.perf_counter() - start
+        result = self.enrich(detections_to_text(detections))
+        result["detections"] = len(detections)
+        result["ocr_seconds"] = round(ocr_seconds, 4)
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        return result
@@ -0,0 +1,146 @@
+# Filename: ocr_preprocess.py
+
+import os
+
+import cv2
+import numpy as np
+
+from address_roi import line_boxes
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Preset applied in front of OCR (see PRESETS)
+PREPROCESS_PRESET = os.environ.get("OCR_PREPROCESS", "fast")
+
+# Median text-line height, in pixels, images are scaled down to (recognizers are trained near 32-64px)
+TARGET_TEXT_HEIGHT = int(os.environ.get("OCR_TARGET_TEXT_HEIGHT", "32"))
+
+# Never shrink the longer side below this, whatever the text height says
+MIN_LONG_SIDE = 640
+
+# Skew angles outside this range are taken to be a misdetection, not a tilted envelope
+MAX_SKEW_DEGREES = 15.0
+
+# Each preset is an ordered set of steps; they always run in the order of STEPS
+STEPS = ("grayscale", "resize", "deskew", "clahe", "threshold")
+PRESETS = {
+    "none": (),
+    "fast": ("grayscale", "resize"),
+    "document": ("grayscale", "resize", "deskew", "clahe"),
+    "binary": ("grayscale", "resize", "deskew", "threshold"),
+}
+
+# -------------------------------
+# Preprocessing Steps
+# -------------------------------
+
+def to_grayscale(image):
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+
+
+def text_scale(image, target_text_height=TARGET_TEXT_HEIGHT, min_long_side=MIN_LONG_SIDE):
+    """Downscale factor (<= 1) that brings the median text line to target_text_height."""
+    boxes = line_boxes(image)
+    if not boxes:
+        return 1.0
+    line_height = float(np.median([y1 - y0 for _, y0, _, y1 in boxes]))
+    scale = min(1.0, target_text_height / max(line_height, 1.0))
+    return max(scale, min(1.0, min_long_side / max(image.shape[:2])))
+
+
+def skew_angle(grey, max_skew=MAX_SKEW_DEGREES):
+    """Median tilt, in degrees, of the text lines in a greyscale image (0.0 if none found)."""
+    _, binary = cv2.threshold(grey, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (25, 3)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    angles = []
+    for contour in contours:
+        (_, _), (width, height), angle = cv2.minAreaRect(contour)
+        if width < height:  # measure along the long side whatever the OpenCV angle convention
+            width, height = height, width
+            angle -= 90.0
+        angle = (angle + 45.0) % 90.0 - 45.0
+        if width > 3 * height and width > grey.shape[1] * 0.05:
+            angles.append(angle)
+    if not angles:
+        return 0.0
+    angle = float(np.median(angles))
+    return angle if abs(angle) <= max_skew else 0.0
+
+
+class Preprocessor:
+    """Grayscale -> adaptive downscale -> deskew -> CLAHE/threshold, per preset.
+
+    Calling it returns (processed image, 2x3 affine matrix from original to
+    processed coordinates) so detections can be mapped back to the frame.
+    """
+
+    def __init__(self, preset=PREPROCESS_PRESET, target_text_height=TARGET_TEXT_HEIGHT):
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown preprocessing preset {preset!r}; expected one of {sorted(PRESETS)}.")
+        self.preset = preset
+        self.steps = PRESETS[preset]
+        self.target_text_height = target_text_height
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+    def __call__(self, image):
+        transform = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        if "grayscale" in self.steps:
+            image = to_grayscale(image)
+        if "resize" in self.steps:
+            scale = text_scale(image, self.target_text_height)
+            if scale < 1.0:
+                height, width = image.shape[:2]
+                image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+                transform = transform * scale
+        if "deskew" in self.steps:
+            angle = skew_angle(to_grayscale(image))
+            if abs(angle) >= 0.5:
+                height, width = image.shape[:2]
+                rotation = cv2.getRotationMatrix2D((width / 2.0, height / 2.0), angle, 1.0)
+                image = cv2.warpAffine(image, rotation, (width, height), flags=cv2.INTER_LINEAR,
+                                       borderMode=cv2.BORDER_REPLICATE)
+                transform = rotation @ np.vstack([transform, [0.0, 0.0, 1.0]])
+        if "clahe" in self.steps:
+            image = self._clahe.apply(to_grayscale(image))
+        if "threshold" in self.steps:
+            image = cv2.adaptiveThreshold(to_grayscale(image), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                          cv2.THRESH_BINARY, 31, 15)
+        return image, transform
+
+
+def map_points(points, transform):
+    """Map [x, y] points through a 2x3 affine matrix."""
+    points = np.asarray(points, dtype=np.float64)
+    return points @ transform[:, :2].T + transform[:, 2]
+
+# -------------------------------
+# Preprocessing Reader
+# -------------------------------
+
+class PreprocessingReader:
+    """Drop-in for easyocr.Reader.readtext that preprocesses the image first.
+
+    Boxes are mapped back to the coordinates of the image passed in, so
+    callers can keep drawing on the original frame. Other attributes are
+    passed through to the wrapped reader.
+    """
+
+    def __init__(self, reader, preset=PREPROCESS_PRESET):
+        self.reader = reader
+        self.preprocessor = Preprocessor(preset)
+
+    def __getattr__(self, name):
+        return getattr(self.reader, name)
+
+    def readtext(self, image, **kwargs):
+        processed, transform = self.preprocessor(image)
+        detections = self.reader.readtext(processed, **kwargs)
+        if np.allclose(transform, np.eye(2, 3)):
+            return detections
+        inverse = cv2.invertAffineTransform(transform)
+        return [(map_points(box, inverse).tolist(), text, confidence) for box, text, confidence in detections]
+
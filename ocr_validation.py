@@ -1,12 +1,10 @@
 import cv2
-import easyocr
-from deep_translator import GoogleTranslator
-from transformers import pipeline
 import requests
 import json
 import logging
-import re  # For regular expression to detect PIN code
-from PIL import Image
+from pincode_client import preprocess_response
+from ocr_engines import log_ocr_stats
+from components import components
 
 # -------------------------------
 # Configuration and Setup
@@ -14,43 +12,30 @@ from PIL import Image
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Initialize EasyOCR with English
-try:
-    reader = easyocr.Reader(['en'], gpu=False)
-except RuntimeError:
-    logging.error("There was an issue loading the EasyOCR language model. Try updating or re-installing EasyOCR.")
+# Heavy components (see components.py) are imported and loaded on first use; main() warms up the
+# OCR reader in the background (COMPONENTS_WARM_UP) while the camera opens
+reader = components.proxy("reader")
 
-# Initialize Translator
-translator = GoogleTranslator(source='auto', target='en')
+# Translator: Latin text skips translation; Indic phrases go through a persistent phrase cache,
+# then Google Translate, then offline transliteration (TRANSLATION_OFFLINE=1 to never call out)
+translator = components.proxy("translator")
 
-# Initialize NLP model for address parsing
-address_parser = pipeline("ner", model="dslim/bert-base-NER")
+# Address parsing: postal gazetteer fast path, shared NER model (loaded on first use) when ambiguous
+address_parser = components.proxy("address_parser")
 
-# Postal Pincode API endpoint
-API_ENDPOINT = "https://api.postalpincode.in/pincode/"
+# Pincode lookups: local postal directory first, cached Postal Pincode API for unknown pincodes
+# (set POSTAL_OFFLINE=1 on stations without connectivity)
+pincode_client = components.proxy("resolver")
 
 # -------------------------------
 # Utility Functions
 # -------------------------------
 
-def preprocess_response(response_text):
-    """Mock preprocessing to simulate ML-like response validation."""
-    if not response_text.strip():
-        return "EmptyResponse"
-    try:
-        data = json.loads(response_text)
-        if not data or "PostOffice" not in data[0] or not data[0]["PostOffice"]:
-            return "InvalidStructure"
-        return "ValidResponse"
-    except json.JSONDecodeError:
-        return "ParseError"
-
 def validate_pincode(pincode):
-    """Validate the PIN code using an external API."""
-    endpoint = f"{API_ENDPOINT}{pincode}"
+    """Validate the PIN code against the postal directory, falling back to the external API."""
     try:
-        response = requests.get(endpoint)
-        logging.info("API request sent, awaiting response.")
+        response = pincode_client.get(pincode)
+        logging.info("PIN code lookup complete.")
         if response.status_code != 200:
             logging.error(f"Unable to fetch data. HTTP Status Code: {response.status_code}")
             return f"Error: HTTP Status Code {response.status_code}"
@@ -77,29 +62,15 @@ def validate_pincode(pincode):
 
 def parse_address(address):
     """Parse the given address using NLP and detect potential PIN code."""
-    entities = address_parser(address)
-    
-    parsed = {}
-    for entity in entities:
-        entity_type = entity['entity']  # Use 'entity' field
-        entity_text = entity['word']  # Use 'word' field
-        if entity_type not in parsed:
-            parsed[entity_type] = []
-        parsed[entity_type].append(entity_text)
-    
-    # Extract PIN code (6-digit number) from the address using regex
-    pincode = None
-    match = re.search(r'\b\d{6}\b', address)
-    if match:
-        pincode = match.group(0)
-    
-    return parsed, pincode
+    return address_parser.parse(address)
 
 # -------------------------------
 # Main OCR and Validation Loop
 # -------------------------------
 
 def main():
+    components.warm_up()
+
     # Open the camera
     cap = cv2.VideoCapture(0)
 
@@ -177,6 +148,11 @@ def main():
     # Release the camera and close all windows
     cap.release()
     cv2.destroyAllWindows()
+    logging.info(f"Pincode resolver stats: {pincode_client.stats()}")
+    logging.info(f"Address parser tiers: {address_parser.stats()}")
+    if components.is_loaded("reader"):
+        log_ocr_stats(components.get("reader"))
+    logging.info(f"Translation stats: {translator.stats()}")
 
 # Run the application
 if __name__ == "__main__":
@@ -1,11 +1,11 @@
 import cv2
-import easyocr
-from deep_translator import GoogleTranslator
-from transformers import pipeline
 import requests
 import json
 import logging
-import re
+from pincode_client import preprocess_response
+from fuzzy_index import api_place_names, best_match
+from ocr_engines import log_ocr_stats
+from components import components
 
 # -------------------------------
 # Configuration and Setup
@@ -13,43 +13,30 @@ import re
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Initialize EasyOCR with English
-try:
-    reader = easyocr.Reader(['en'], gpu=False)
-except RuntimeError:
-    logging.error("There was an issue loading the EasyOCR language model. Try updating or re-installing EasyOCR.")
+# Heavy components (see components.py) are imported and loaded on first use; main() warms up the
+# OCR reader in the background (COMPONENTS_WARM_UP) while the camera opens
+reader = components.proxy("reader")
 
-# Initialize Translator
-translator = GoogleTranslator(source='auto', target='en')
+# Translator: Latin text skips translation; Indic phrases go through a persistent phrase cache,
+# then Google Translate, then offline transliteration (TRANSLATION_OFFLINE=1 to never call out)
+translator = components.proxy("translator")
 
-# Initialize NLP model for address parsing
-address_parser = pipeline("ner", model="dslim/bert-base-NER")
+# Address parsing: postal gazetteer fast path, shared NER model (loaded on first use) when ambiguous
+address_parser = components.proxy("address_parser")
 
-# Postal Pincode API endpoint
-API_ENDPOINT = "https://api.postalpincode.in/pincode/"
+# Pincode lookups: local postal directory first, cached Postal Pincode API for unknown pincodes
+# (set POSTAL_OFFLINE=1 on stations without connectivity)
+pincode_client = components.proxy("resolver")
 
 # -------------------------------
 # Utility Functions
 # -------------------------------
 
-def preprocess_response(response_text):
-    """Mock preprocessing to simulate ML-like response validation."""
-    if not response_text.strip():
-        return "EmptyResponse"
-    try:
-        data = json.loads(response_text)
-        if not data or "PostOffice" not in data[0] or not data[0]["PostOffice"]:
-            return "InvalidStructure"
-        return "ValidResponse"
-    except json.JSONDecodeError:
-        return "ParseError"
-
 def validate_pincode(pincode, scanned_text):
-    """Validate the PIN code using an external API and compare with OCR scanned text."""
-    endpoint = f"{API_ENDPOINT}{pincode}"
+    """Validate the PIN code against the postal directory (or the API) and compare with OCR scanned text."""
     try:
-        response = requests.get(endpoint)
-        logging.info("API request sent, awaiting response.")
+        response = pincode_client.get(pincode)
+        logging.info("PIN code lookup complete.")
         if response.status_code != 200:
             logging.error(f"Unable to fetch data. HTTP Status Code: {response.status_code}")
             return f"Error: HTTP Status Code {response.status_code}"
@@ -65,13 +52,15 @@ def validate_pincode(pincode, scanned_text):
             return "Error: Invalid response structure or no data found for this PIN code."
         else:
             pincode_information = json.loads(response.text)
-            necessary_information = pincode_information[0]["PostOffice"][0]
-            region_name = necessary_information.get("Region", "").lower()
-            
-            # Check if any word in the scanned text matches the region name
-            if any(word.lower() == region_name for word in scanned_text.split()):
-                logging.info("Validation Successful: Region matches with scanned text.")
-                return f"Validation Successful: Region '{region_name}' matches with scanned text."
+            post_offices = pincode_information[0]["PostOffice"]
+            region_name = post_offices[0].get("Region", "").lower()
+
+            # Fuzzy-match the office, district, division and region names against the scanned text
+            match = best_match(api_place_names(post_offices), scanned_text)
+            if match:
+                logging.info(f"Validation Successful: {match.kind} '{match.name}' matches '{match.text}' "
+                             f"(score {match.score}).")
+                return f"Validation Successful: {match.kind.capitalize()} '{match.name}' matches with scanned text."
             else:
                 logging.warning("No match found for the region in the scanned text.")
                 return f"No match found for the region '{region_name}' in the scanned text."
@@ -81,29 +70,15 @@ def validate_pincode(pincode, scanned_text):
 
 def parse_address(address):
     """Parse the given address using NLP and detect potential PIN code."""
-    entities = address_parser(address)
-    
-    parsed = {}
-    for entity in entities:
-        entity_type = entity['entity']  # Use 'entity' field
-        entity_text = entity['word']  # Use 'word' field
-        if entity_type not in parsed:
-            parsed[entity_type] = []
-        parsed[entity_type].append(entity_text)
-    
-    # Extract PIN code (6-digit number) from the address using regex
-    pincode = None
-    match = re.search(r'\b\d{6}\b', address)
-    if match:
-        pincode = match.group(0)
-    
-    return parsed, pincode
+    return address_parser.parse(address)
 
 # -------------------------------
 # Main OCR and Validation Loop
 # -------------------------------
 
 def main():
+    components.warm_up()
+
     # Open the camera
     cap = cv2.VideoCapture(0)
 
@@ -181,6 +156,11 @@ def main():
     # Release the camera and close all windows
     cap.release()
     cv2.destroyAllWindows()
+    logging.info(f"Pincode resolver stats: {pincode_client.stats()}")
+    logging.info(f"Address parser tiers: {address_parser.stats()}")
+    if components.is_loaded("reader"):
+        log_ocr_stats(components.get("reader"))
+    logging.info(f"Translation stats: {translator.stats()}")
 
 # Run the application
 if __name__ == "__main__":
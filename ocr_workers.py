@@ -0,0 +1,243 @@
+# Filename: ocr_workers.py
+
+import logging
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+
+from address_roi import ROI_MODE
+from ocr_preprocess import PREPROCESS_PRESET
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Images waiting between the decode -> OCR and OCR -> validation stages
+QUEUE_DEPTH_PER_WORKER = 2
+
+# Torch threads per OCR process; 1 keeps N processes from oversubscribing N cores
+TORCH_THREADS_PER_WORKER = int(os.environ.get("OCR_TORCH_THREADS", "1"))
+
+# Longest wait for the workers to load their OCR models
+READY_TIMEOUT_SECONDS = float(os.environ.get("OCR_WORKER_READY_TIMEOUT", "600"))
+
+# Shuts a worker down
+_STOP = None
+
+# -------------------------------
+# OCR Worker Process
+# -------------------------------
+
+def _ocr_worker(languages, inbox, results, ready_queue, torch_threads, roi_mode, preprocess):
+    """Load the OCR engines, then recognize images from this worker's inbox until the stop sentinel arrives.
+
+    `results` is a SimpleQueue: put() has written the result to the pipe
+    when it returns, so no finished result dies with the process.
+    """
+    from ocr_engines import create_reader
+
+    try:
+        import torch
+    except ImportError:
+        pass  # Tesseract-only install: nothing to pin
+    else:
+        torch.set_num_threads(torch_threads)
+    reader = create_reader(languages, roi_mode=roi_mode, preprocess=preprocess)
+    reader.load()
+    ready_queue.put(os.getpid())
+    while True:
+        item = inbox.get()
+        if item is _STOP:
+            return
+        sequence, source, image = item
+        start = time.perf_counter()
+        try:
+            detections = reader.readtext(image)
+            results.put((sequence, source, detections, time.perf_counter() - start, None))
+        except Exception as e:
+            results.put((sequence, source, None, time.perf_counter() - start, str(e)))
+
+# -------------------------------
+# Staged Pool
+# -------------------------------
+
+class OcrWorkerPool:
+    """Decode -> OCR -> validation over bounded queues, with OCR in worker processes.
+
+    A decode thread hands images to `workers` processes, each holding its
+    own OCR engines, and the caller's thread consumes recognized text for
+    the (I/O-bound) enrichment stage. Each worker has its own inbox and the
+    pool records which worker every image went to, so the images a dead
+    worker had taken are known however it died. Bounded queues keep memory
+    flat: decoding stalls when every worker has a full inbox, and OCR
+    stalls when validation falls behind.
+    """
+
+    def __init__(self, workers=None, languages=("en",), queue_depth=None, torch_threads=TORCH_THREADS_PER_WORKER,
+                 roi_mode=ROI_MODE, preprocess=PREPROCESS_PRESET):
+        self.workers = workers or os.cpu_count() or 1
+        self.languages = list(languages)
+        depth = queue_depth or self.workers * QUEUE_DEPTH_PER_WORKER
+        context = mp.get_context("spawn")  # torch is not fork-safe once initialized
+        self.inboxes = [context.Queue() for _ in range(self.workers)]
+        # Images handed to a worker and not yet answered, at most this many per worker
+        self.inbox_depth = max(1, depth // self.workers)
+        self.results = context.SimpleQueue()
+        # Filled from `results` by the collector thread; bounded, so OCR stalls when validation does
+        self.out_queue = queue.Queue(maxsize=depth)
+        self.ready_queue = context.Queue()
+        self._ready = 0
+        self._next_sequence = 0  # numbers every image across runs, so results are matched to their run
+        # sequence -> worker slot of every image handed out and not yet answered; guarded by _assigned_changed
+        self._assigned = {}
+        self._load = [0] * self.workers
+        self._dead = set()
+        self._assigned_changed = threading.Condition()
+        self.processes = [
+            context.Process(target=_ocr_worker,
+                            args=(self.languages, inbox, self.results, self.ready_queue,
+                                  torch_threads, roi_mode, preprocess),
+                            daemon=True)
+            for inbox in self.inboxes
+        ]
+        for process in self.processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, name="ocr-results", daemon=True)
+        self._collector.start()
+
+    def _collect(self):
+        while True:
+            item = self.results.get()
+            if item is _STOP:
+                return
+            self.out_queue.put(item)
+
+    def wait_ready(self, timeout=READY_TIMEOUT_SECONDS):
+        """Block until every worker has loaded its reader.
+
+        Raises RuntimeError if a worker exits while loading and TimeoutError
+        if they are not all ready within `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while self._ready < len(self.processes):
+            try:
+                self.ready_queue.get(timeout=min(1.0, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                dead = [process for process in self.processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"OCR worker {dead[0].pid} exited with code {dead[0].exitcode} "
+                                       f"while loading its models.")
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"OCR workers not ready after {timeout:.0f}s.")
+                continue
+            self._ready += 1
+
+    def _assign(self, sequence):
+        """Reserve inbox space on the least loaded live worker for an image; None once every worker is dead."""
+        with self._assigned_changed:
+            while True:
+                live = [slot for slot in range(self.workers) if slot not in self._dead]
+                if not live:
+                    return None
+                slot = min(live, key=self._load.__getitem__)
+                if self._load[slot] < self.inbox_depth:
+                    self._assigned[sequence] = slot
+                    self._load[slot] += 1
+                    return slot
+                self._assigned_changed.wait()
+
+    def _answered(self, sequence):
+        with self._assigned_changed:
+            slot = self._assigned.pop(sequence, None)
+            if slot is not None:
+                self._load[slot] -= 1
+                self._assigned_changed.notify_all()
+
+    def _decode_stage(self, sources, decode, run):
+        try:
+            for source, loader in sources:
+                sequence = self._next_sequence
+                self._next_sequence += 1
+                try:
+                    image = decode(loader())
+                except Exception as e:
+                    logging.error(f"Failed to read {source}: {e}")
+                    image = None
+                run["outstanding"][sequence] = source
+                if image is None:
+                    self.out_queue.put((sequence, source, None, 0.0, "Could not decode image."))
+                    continue
+                slot = self._assign(sequence)
+                if slot is None:
+                    return  # left outstanding: imap raises once it sees every worker dead
+                self.inboxes[slot].put((sequence, source, image))
+        finally:
+            run["finished"].set()
+
+    def _lost_items(self, run):
+        """Error results for the images handed to workers that have since died."""
+        lost = []
+        for slot, process in enumerate(self.processes):
+            if process.is_alive() or slot in self._dead:
+                continue
+            with self._assigned_changed:
+                self._dead.add(slot)
+                sequences = [sequence for sequence, owner in self._assigned.items() if owner == slot]
+                for sequence in sequences:
+                    del self._assigned[sequence]
+                self._load[slot] = 0
+                self._assigned_changed.notify_all()
+            for sequence in sequences:
+                source = run["outstanding"].pop(sequence, None)
+                if source is not None:
+                    logging.error(f"OCR worker {process.pid} exited with code {process.exitcode} "
+                                  f"before reading {source}.")
+                    lost.append((source, None, 0.0, f"OCR worker exited with code {process.exitcode}."))
+        return lost
+
+    def imap(self, sources, decode):
+        """Yield (source, detections, ocr_seconds, error) as workers finish, in completion order.
+
+        Images handed to a worker that dies before answering them (the one
+        that killed it and any waiting in its inbox) are yielded with an
+        error instead of being waited for; they are not re-sent, so one bad
+        image cannot take down every worker. RuntimeError is raised once no
+        worker is left to read the rest. Runs must be consumed to the end
+        before the next imap() call.
+        """
+        run = {"outstanding": {}, "finished": threading.Event()}
+        feeder = threading.Thread(target=self._decode_stage, args=(sources, decode, run),
+                                  name="ocr-decode", daemon=True)
+        feeder.start()
+        while not (run["finished"].is_set() and not run["outstanding"]):
+            try:
+                sequence, source, detections, ocr_seconds, error = self.out_queue.get(timeout=0.1)
+            except queue.Empty:
+                yield from self._lost_items(run)
+                if len(self._dead) == len(self.processes) and run["outstanding"]:
+                    raise RuntimeError("All OCR worker processes have exited.")
+                continue
+            self._answered(sequence)
+            # Results of images already reported lost (or left over from an abandoned run) are dropped
+            if run["outstanding"].pop(sequence, None) is not None:
+                yield source, detections, ocr_seconds, error
+        feeder.join()
+
+    def close(self):
+        for inbox in self.inboxes:
+            inbox.put(_STOP)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.results.put(_STOP)
+        self._collector.join(timeout=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -1,20 +1,21 @@
 import cv2
-import pytesseract
-from googletrans import Translator
-import re
+from ocr_preprocess import Preprocessor
+from ocr_engines import TesseractEngine
+from translation import dominant_script, get_translator
 
-# Set up Tesseract executable path
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# Tesseract (Tamil + English, --psm 6); set TESSERACT_CMD if the binary is not on PATH,
+# e.g. C:\Program Files\Tesseract-OCR\tesseract.exe
+ocr_engine = TesseractEngine(['ta', 'en'])
 
-# Initialize Google Translator
-translator = Translator()
+# Normalize frames before Tesseract (OCR_PREPROCESS selects the preset)
+preprocess = Preprocessor()
+
+# Translator: cached phrases, Google Translate, offline Tamil transliteration as a fallback
+translator = get_translator()
 
 # Open the camera
 cap = cv2.VideoCapture(0)
 
-# Regular expression to check for Tamil characters
-tamil_characters = re.compile("[\u0B80-\u0BFF]")
-
 if not cap.isOpened():
     print("Error: Could not open the webcam.")
 else:
@@ -35,14 +36,13 @@ else:
 
         # If 'c' key is pressed, capture the image and process it
         if key == ord('c'):
-            # OCR with original color frame
-            custom_config = r'--oem 3 --psm 6'
-            text = pytesseract.image_to_string(frame, lang='tam+eng', config=custom_config)
-
-            # Check if the text contains Tamil characters
-            if tamil_characters.search(text):
-                # Translate to English if Tamil text is detected
-                translated_text = translator.translate(text, dest='en').text
+            # OCR on the preprocessed frame
+            text = "\n".join(detection[1] for detection in ocr_engine.readtext(preprocess(frame)[0]))
+
+            # Check if the text contains Tamil (or any other Indic script) characters
+            if dominant_script(text) != "latin":
+                # Translate to English if Indic text is detected
+                translated_text = translator.translate(text)
                 print("Recognized Text (Translated to English):\n", translated_text)
             else:
                 # Just display the text if it's in English
@@ -60,3 +60,4 @@ else:
 # Release the camera and close all OpenCV windows
 cap.release()
 cv2.destroyAllWindows()
+print("Translation:", translator.stats())
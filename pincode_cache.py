@@ -0,0 +1,179 @@
+# Filename: pincode_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from pincode_client import get_client, preprocess_response
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+CACHE_MAX_ENTRIES = int(os.environ.get("POSTAL_CACHE_MAX_ENTRIES", "4096"))
+CACHE_TTL = float(os.environ.get("POSTAL_CACHE_TTL", str(24 * 3600)))
+NEGATIVE_CACHE_TTL = float(os.environ.get("POSTAL_NEGATIVE_CACHE_TTL", "600"))
+
+# Optional SQLite file that keeps cached responses across restarts
+CACHE_DB_PATH = os.environ.get("POSTAL_CACHE_DB")
+
+# -------------------------------
+# In-Process TTL + LRU Cache
+# -------------------------------
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+# -------------------------------
+# On-Disk Backing Store
+# -------------------------------
+
+class SqliteCacheStore:
+    """Persists cached response bodies in SQLite so they survive restarts."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pincode_cache ("
+            " pincode TEXT PRIMARY KEY, body TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, pincode):
+        """Return (body, remaining_ttl) or None if absent or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM pincode_cache WHERE pincode = ?", (pincode,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], row[1] - time.time()
+
+    def put(self, pincode, body, ttl):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pincode_cache (pincode, body, expires_at) VALUES (?, ?, ?)",
+                (pincode, body, time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pincode_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# -------------------------------
+# Caching Client
+# -------------------------------
+
+class CachedResponse(NamedTuple):
+    """Minimal stand-in for requests.Response served from the cache."""
+    status_code: int
+    text: str
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class CachedPincodeClient:
+    """Caches PincodeClient responses in memory (and optionally on disk).
+
+    Successful lookups are kept for `ttl` seconds, "no records found"
+    answers for `negative_ttl` seconds. HTTP errors and network failures are
+    never cached.
+    """
+
+    def __init__(self, client=None, cache=None, store=None, ttl=CACHE_TTL, negative_ttl=NEGATIVE_CACHE_TTL):
+        self.client = client or get_client()
+        self.cache = cache or TTLCache()
+        self.store = store
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._counter_lock = threading.Lock()
+        self.counters = {"hits": 0, "negative_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _count(self, name):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def get(self, pincode):
+        """Same contract as PincodeClient.get, answering from the cache when possible."""
+        body = self.cache.get(pincode)
+        if body is not None:
+            self._count("negative_hits" if preprocess_response(body) == "InvalidStructure" else "hits")
+            return CachedResponse(200, body)
+
+        if self.store is not None:
+            stored = self.store.get(pincode)
+            if stored is not None:
+                body, remaining = stored
+                self.cache.put(pincode, body, remaining)
+                self._count("disk_hits")
+                return CachedResponse(200, body)
+
+        self._count("misses")
+        response = self.client.get(pincode)
+        if response.status_code == 200:
+            status = preprocess_response(response.text)
+            if status == "ValidResponse":
+                self._remember(pincode, response.text, self.ttl)
+            elif status == "InvalidStructure":
+                self._remember(pincode, response.text, self.negative_ttl)
+        return response
+
+    def _remember(self, pincode, body, ttl):
+        self.cache.put(pincode, body, ttl)
+        if self.store is not None:
+            self.store.put(pincode, body, ttl)
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self.counters)
+        lookups = sum(stats.values())
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else None
+        stats["entries"] = len(self.cache)
+        stats["evictions"] = self.cache.evictions
+        stats["expirations"] = self.cache.expirations
+        return stats
+
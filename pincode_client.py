@@ -0,0 +1,144 @@
+# Filename: pincode_client.py
+
+import asyncio
+import json
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Postal Pincode API endpoint (point at stub_postal_server.py for local testing)
+API_ENDPOINT = os.environ.get("POSTAL_API_ENDPOINT", "https://api.postalpincode.in/pincode/")
+
+# (connect, read) timeouts in seconds
+CONNECT_TIMEOUT = float(os.environ.get("POSTAL_API_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("POSTAL_API_READ_TIMEOUT", "10"))
+
+# Retries for connection errors and transient HTTP statuses
+MAX_RETRIES = int(os.environ.get("POSTAL_API_RETRIES", "3"))
+BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Keep-alive connections held per host
+POOL_SIZE = 10
+
+# -------------------------------
+# Response Handling
+# -------------------------------
+
+def preprocess_response(response_text):
+    """Mock preprocessing to simulate ML-like response validation."""
+    if not response_text.strip():
+        return "EmptyResponse"
+    try:
+        data = json.loads(response_text)
+        if not data or "PostOffice" not in data[0] or not data[0]["PostOffice"]:
+            return "InvalidStructure"
+        return "ValidResponse"
+    except json.JSONDecodeError:
+        return "ParseError"
+
+# -------------------------------
+# Synchronous Client
+# -------------------------------
+
+class PincodeClient:
+    """Pincode lookups over a keep-alive requests.Session with retries and timeouts."""
+
+    def __init__(self, endpoint=API_ENDPOINT, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, pool_size=POOL_SIZE):
+        self.endpoint = endpoint
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, pincode):
+        """GET the raw API response for a pincode. Raises requests.RequestException on failure."""
+        return self.session.get(f"{self.endpoint}{pincode}", timeout=self.timeout)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_client():
+    """Process-wide shared PincodeClient, created on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = PincodeClient()
+    return _default_client
+
+# -------------------------------
+# Asynchronous Client
+# -------------------------------
+
+class AsyncPincodeClient:
+    """httpx-based async variant with the same pooling, timeout and retry policy."""
+
+    def __init__(self, endpoint=API_ENDPOINT, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, pool_size=POOL_SIZE):
+        import httpx
+
+        self._httpx = httpx
+        self.endpoint = endpoint
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def get(self, pincode):
+        """GET the raw API response for a pincode, retrying transient failures with backoff."""
+        url = f"{self.endpoint}{pincode}"
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.get(url)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            except self._httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"Pincode API request failed ({e}); retrying.")
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def get_many(self, pincodes):
+        """Fetch several pincodes concurrently over the shared connection pool."""
+        return await asyncio.gather(*(self.get(pincode) for pincode in pincodes), return_exceptions=True)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+        return False
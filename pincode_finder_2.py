@@ -1,27 +1,15 @@
 import requests
 import json
 import logging
+from pincode_client import get_client, preprocess_response
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def preprocess_response(response_text):
-    """Mock preprocessing to simulate ML-like response validation."""
-    if not response_text.strip():
-        return "EmptyResponse"
-    try:
-        data = json.loads(response_text)
-        if not data or "PostOffice" not in data[0] or not data[0]["PostOffice"]:
-            return "InvalidStructure"
-        return "ValidResponse"
-    except json.JSONDecodeError:
-        return "ParseError"
-
 def main():
     pincode = input("Enter the pincode: ").strip()  
-    endpoint = f"https://api.postalpincode.in/pincode/{pincode}" 
 
     try:
-        response = requests.get(endpoint)
+        response = get_client().get(pincode)
 
         logging.info("API request sent, awaiting response.")
 
@@ -1,81 +1,33 @@
 import requests
 import json
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import pickle
+from pincode_resolver import get_resolver
+from pincode_rules import REASONS, VALID, zone_name
 
 # ------------------------------
-# Step 1: Create or Load Dataset
+# Step 1: Build the Validator
 # ------------------------------
 
-# Simulate a dataset of PIN codes and their response status
-data = {
-    "pincode": ["560001", "110001", "123456", "000000"],
-    "status": ["ValidResponse", "ValidResponse", "InvalidStructure", "EmptyResponse"]
-}
-
-# Convert to DataFrame
-df = pd.DataFrame(data)
-
-# Feature extraction using CountVectorizer
-vectorizer = CountVectorizer()
-X = vectorizer.fit_transform(df["pincode"])
-
-# Encode target labels
-y = df["status"].astype("category").cat.codes  # Encode labels as integers
-
-# Split dataset into training and testing sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.25, random_state=42)
-
-# ------------------------------
-# Step 2: Train ML Model
-# ------------------------------
-
-# Train a Random Forest classifier
-model = RandomForestClassifier(random_state=42)
-model.fit(X_train, y_train)
-
-# Save the trained model and vectorizer
-with open("ml_model.pkl", "wb") as f:
-    pickle.dump(model, f)
-with open("vectorizer.pkl", "wb") as f:
-    pickle.dump(vectorizer, f)
-
-# Evaluate model accuracy
-y_pred = model.predict(X_test)
-print(f"Model Accuracy: {accuracy_score(y_test, y_pred) * 100:.2f}%")
+# Format and postal-zone rules (plus directory prefixes when the resolver gates on them)
+resolver = get_resolver()
+validator = resolver.validator
 
 # ------------------------------
-# Step 3: Use the ML Model in the Pipeline
+# Step 2: Validate the PIN Code
 # ------------------------------
 
-# Load the model and vectorizer
-with open("ml_model.pkl", "rb") as f:
-    ml_model = pickle.load(f)
-with open("vectorizer.pkl", "rb") as f:
-    vectorizer = pickle.load(f)
-
 def preprocess_pincode(pincode):
     """Preprocess the input PIN code."""
     return pincode.strip()
 
 def classify_pincode(pincode):
-    """Use the ML model to classify the PIN code."""
-    vectorized_input = vectorizer.transform([pincode])
-    prediction = ml_model.predict(vectorized_input)[0]
-    status_mapping = dict(enumerate(df["status"].astype("category").cat.categories))
-    return status_mapping[prediction]
+    """Rule-based check of the PIN code structure; "ValidResponse" when a lookup is worthwhile."""
+    status = validator.check_one(pincode)
+    return "ValidResponse" if status == VALID else REASONS[status]
 
 # ------------------------------
-# Step 4: Integration with API
+# Step 3: Integration with API
 # ------------------------------
 
-# API Endpoint
-ENDPOINT = "https://api.postalpincode.in/pincode/"
-
 # Input PIN code
 pincode = input("Enter your PIN code: ")
 
@@ -83,12 +35,13 @@ try:
     # Preprocessing step
     processed_pincode = preprocess_pincode(pincode)
 
-    # ML model classification
+    # Structural validation
     classification = classify_pincode(processed_pincode)
 
     # Fetch data if classification is valid
     if classification == "ValidResponse":
-        response = requests.get(ENDPOINT + processed_pincode, timeout=10)
+        print(f"Postal zone: {zone_name(processed_pincode)}")
+        response = resolver.get(processed_pincode)
         if response.status_code != 200:
             print(f"Error: Unable to fetch data. HTTP Status Code: {response.status_code}")
         elif not response.text.strip():
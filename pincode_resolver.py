@@ -0,0 +1,132 @@
+# Filename: pincode_resolver.py
+
+import json
+import logging
+import os
+import threading
+
+from pincode_cache import CACHE_DB_PATH, CachedPincodeClient, CachedResponse, SqliteCacheStore
+from pincode_rules import VALID, PincodeValidator
+from postal_index import PostalIndex, api_response_for
+from postal_snapshot import SNAPSHOT_SUFFIX, PostalSnapshot
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Local postal directory: a CSV path, a snapshot built by postal_snapshot.py (*.snap),
+# or "db" for the SQLite database kept by main.py
+POSTAL_DIRECTORY = os.environ.get("POSTAL_DIRECTORY", os.environ.get("POSTAL_CSV", "coimbature_df (1).csv"))
+
+# Never touch the network; unknown pincodes resolve as "no records found"
+POSTAL_OFFLINE = os.environ.get("POSTAL_OFFLINE", "0") == "1"
+
+# Also reject pincodes whose 3-digit prefix is not in the local directory, before any lookup.
+# Only sound when the directory covers all of India (always on in offline mode).
+POSTAL_PREFIX_GATE = os.environ.get("POSTAL_PREFIX_GATE", "0") == "1"
+
+# -------------------------------
+# Local Directory Loading
+# -------------------------------
+
+def load_directory(source=POSTAL_DIRECTORY):
+    """Build a PostalIndex from a directory CSV or the postal database, or map a snapshot."""
+    if source.endswith(SNAPSHOT_SUFFIX):
+        return PostalSnapshot(source)
+    if source == "db":
+        from postal_db import SessionLocal, all_offices
+
+        db = SessionLocal()
+        try:
+            return PostalIndex(all_offices(db))
+        finally:
+            db.close()
+    return PostalIndex.from_csv(source)
+
+# -------------------------------
+# Offline-First Resolver
+# -------------------------------
+
+class PincodeResolver:
+    """Resolves pincodes from the local directory first and the postal API second.
+
+    get() keeps the PincodeClient contract (an object with status_code and
+    text), so callers written against the API need no changes. In offline
+    mode unknown pincodes get the API's "no records found" answer instead of
+    a network call. Pincodes failing the validator's structural checks get
+    that answer too, without a lookup or a call.
+    """
+
+    def __init__(self, directory=None, client=None, offline=POSTAL_OFFLINE, validator=None):
+        self.directory = directory if directory is not None else PostalIndex()
+        self.offline = offline
+        self.validator = validator if validator is not None else PincodeValidator()
+        self.client = client if client is not None or offline else CachedPincodeClient(
+            store=SqliteCacheStore(CACHE_DB_PATH) if CACHE_DB_PATH else None
+        )
+        self._counter_lock = threading.Lock()
+        self.counters = {"local": 0, "remote": 0, "offline_misses": 0, "rejected": 0}
+
+    def _count(self, name):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def resolve(self, pincode):
+        """Return the API-shaped PostOffice records for a pincode ([] if unknown)."""
+        offices = self.directory.lookup(pincode)
+        if offices:
+            self._count("local")
+            return [office.as_api_record() for office in offices]
+        response = self.get(pincode)
+        if response.status_code != 200:
+            return []
+        try:
+            return json.loads(response.text)[0].get("PostOffice") or []
+        except (ValueError, IndexError, AttributeError):
+            return []
+
+    def get(self, pincode):
+        """Same contract as PincodeClient.get, answering locally whenever possible."""
+        if self.validator.check_one(pincode) != VALID:
+            self._count("rejected")
+            return CachedResponse(200, json.dumps(api_response_for(())))
+        if pincode in self.directory:
+            self._count("local")
+            return CachedResponse(200, json.dumps(self.directory.api_response(pincode)))
+        if self.offline:
+            self._count("offline_misses")
+            logging.warning(f"Offline mode: PIN code {pincode} is not in the local postal directory.")
+            return CachedResponse(200, json.dumps(self.directory.api_response(pincode)))
+        self._count("remote")
+        return self.client.get(pincode)
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self.counters)
+        stats["offline"] = self.offline
+        stats["directory_pincodes"] = len(self.directory.pincodes())
+        if isinstance(self.client, CachedPincodeClient):
+            stats["cache"] = self.client.stats()
+        return stats
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_resolver():
+    """Process-wide PincodeResolver over POSTAL_DIRECTORY, created on first use."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                try:
+                    directory = load_directory()
+                    logging.info(f"Local postal directory loaded: {len(directory.pincodes())} pincodes.")
+                except (OSError, KeyError, ValueError) as e:
+                    logging.error(f"Could not load the local postal directory ({e}); using the API only.")
+                    directory = PostalIndex()
+                validator = None
+                if (POSTAL_PREFIX_GATE or POSTAL_OFFLINE) and len(directory):
+                    validator = PincodeValidator.from_index(directory)
+                _resolver = PincodeResolver(directory, validator=validator)
+    return _resolver
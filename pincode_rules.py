@@ -0,0 +1,155 @@
+# Filename: pincode_rules.py
+
+import numpy as np
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# First digit of a PIN code -> postal zone
+ZONES = {
+    1: "Delhi, Haryana, Punjab, Himachal Pradesh, Jammu & Kashmir, Ladakh, Chandigarh",
+    2: "Uttar Pradesh, Uttarakhand",
+    3: "Rajasthan, Gujarat, Dadra & Nagar Haveli and Daman & Diu",
+    4: "Maharashtra, Goa, Madhya Pradesh, Chhattisgarh",
+    5: "Andhra Pradesh, Telangana, Karnataka",
+    6: "Tamil Nadu, Kerala, Puducherry, Lakshadweep",
+    7: "West Bengal, Odisha, North East, Sikkim, Andaman & Nicobar",
+    8: "Bihar, Jharkhand",
+    9: "Army Postal Service",
+}
+
+# Field post offices are not in the civil directory, so their sorting districts are never checked
+APS_ZONE = 9
+
+# Status codes returned by PincodeValidator.check (uint8)
+VALID = 0
+BAD_FORMAT = 1
+BAD_ZONE = 2
+UNKNOWN_PREFIX = 3
+
+REASONS = {
+    VALID: "Valid PIN code structure.",
+    BAD_FORMAT: "A PIN code is exactly six digits.",
+    BAD_ZONE: "The first digit of a PIN code is a postal zone from 1 to 9.",
+    UNKNOWN_PREFIX: "No sorting district in the postal directory has this 3-digit prefix.",
+}
+
+_PLACE_VALUES = np.array([100000, 10000, 1000, 100, 10, 1], dtype=np.int32)
+
+# -------------------------------
+# Structural Validation
+# -------------------------------
+
+def _as_text(item):
+    if isinstance(item, (bytes, bytearray)):
+        return item.decode("latin-1")
+    if isinstance(item, (int, np.integer)) and 0 <= item <= 999999:
+        return f"{int(item):06d}"
+    return item if isinstance(item, str) else str(item)
+
+
+def _sequence_values(items):
+    """pincode_values for a Python sequence.
+
+    Only items of exactly six characters go into the fixed-width array, so one
+    oversized item cannot widen (and multiply the memory of) every slot.
+    """
+    texts = [_as_text(item) for item in items]
+    sized = np.fromiter((len(text) == 6 for text in texts), dtype=bool, count=len(texts))
+    values = np.zeros(len(texts), dtype=np.int32)
+    well_formed = np.zeros(len(texts), dtype=bool)
+    if sized.any():
+        codes = np.array([text for text, ok in zip(texts, sized) if ok], dtype="U6")
+        values[sized], well_formed[sized] = pincode_values(codes)
+    return values, well_formed
+
+
+def pincode_values(pincodes):
+    """(values, well_formed) arrays for a sequence of PIN codes as strings, bytes or integers.
+
+    String arrays are read as their code points in place (no per-item
+    Python work), so this runs at array speed on millions of codes.
+    Values of malformed codes are 0.
+    """
+    if not isinstance(pincodes, np.ndarray):
+        return _sequence_values(list(pincodes))
+    if pincodes.dtype.kind == "O":
+        return _sequence_values(pincodes.reshape(-1).tolist())
+    codes = pincodes.reshape(-1)
+    if not len(codes):
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=bool)
+    if codes.dtype.kind in "iu":
+        well_formed = (codes >= 0) & (codes <= 999999)
+        return np.where(well_formed, codes, 0).astype(np.int32), well_formed
+    if codes.dtype.kind not in "US":
+        raise TypeError(f"Cannot read PIN codes from an array of {codes.dtype}.")
+    unit = np.uint32 if codes.dtype.kind == "U" else np.uint8
+    width = codes.dtype.itemsize // np.dtype(unit).itemsize
+    if width < 6:
+        return np.zeros(len(codes), dtype=np.int32), np.zeros(len(codes), dtype=bool)
+    characters = np.ascontiguousarray(codes).view(unit).reshape(len(codes), width)
+    digits = characters[:, :6].astype(np.int32) - ord("0")
+    well_formed = ((digits >= 0) & (digits <= 9)).all(axis=1) & (characters[:, 6:] == 0).all(axis=1)
+    values = np.where(well_formed, digits @ _PLACE_VALUES, 0).astype(np.int32)
+    return values, well_formed
+
+
+class PincodeValidator:
+    """Rule-based PIN code checks: format, postal zone and sorting-district prefix.
+
+    A PIN code is six digits; the first is the postal zone (1-9) and the
+    first three the sorting district. The prefix table holds the 3-digit
+    prefixes present in a postal directory; without one only format and
+    zone are checked. check() classifies whole arrays with NumPy and
+    check_one() is the per-code path, cheap enough to sit in front of any
+    lookup.
+    """
+
+    def __init__(self, prefixes=None):
+        self.prefixes = None
+        if prefixes is not None:
+            self.prefixes = np.zeros(1000, dtype=bool)
+            self.prefixes[np.asarray(list(prefixes), dtype=np.int64)] = True
+            self.prefixes[APS_ZONE * 100:] = True
+            self._prefix_set = frozenset(np.flatnonzero(self.prefixes).tolist())
+
+    @classmethod
+    def from_pincodes(cls, pincodes):
+        values, well_formed = pincode_values(list(pincodes))
+        return cls(np.unique(values[well_formed] // 1000))
+
+    @classmethod
+    def from_index(cls, index):
+        """Prefix table of a PostalIndex or PostalSnapshot."""
+        keys = getattr(index, "pincode_keys", None)
+        if keys is not None:
+            return cls(np.unique(np.asarray(keys) // 1000))
+        return cls.from_pincodes(index.pincodes())
+
+    def check(self, pincodes):
+        """uint8 status (VALID, BAD_FORMAT, BAD_ZONE, UNKNOWN_PREFIX) per PIN code."""
+        values, well_formed = pincode_values(pincodes)
+        status = np.where(values // 100000 == 0, BAD_ZONE, VALID).astype(np.uint8)
+        if self.prefixes is not None:
+            status[(status == VALID) & ~self.prefixes[values // 1000]] = UNKNOWN_PREFIX
+        status[~well_formed] = BAD_FORMAT
+        return status
+
+    def check_one(self, pincode):
+        if not isinstance(pincode, str) or len(pincode) != 6 or not (pincode.isascii() and pincode.isdigit()):
+            return BAD_FORMAT
+        if pincode[0] == "0":
+            return BAD_ZONE
+        if self.prefixes is not None and int(pincode[:3]) not in self._prefix_set:
+            return UNKNOWN_PREFIX
+        return VALID
+
+    def is_valid(self, pincode):
+        return self.check_one(pincode) == VALID
+
+
+def zone_name(pincode):
+    """Postal zone of a PIN code, e.g. "Tamil Nadu, Kerala, ..." for 641104 (None if malformed)."""
+    pincode = str(pincode)
+    return ZONES.get(int(pincode[0])) if pincode[:1].isdigit() else None
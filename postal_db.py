@@ -0,0 +1,330 @@
+# Filename: postal_db.py
+
+import os
+import time
+
+from sqlalchemy import (create_engine, Column, String, Integer, Float, ForeignKey,
+                        Index, UniqueConstraint, select, update)
+from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from postal_index import Office, office_key
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# Database Configuration
+DATABASE_URL = os.environ.get("POSTAL_DATABASE_URL", "sqlite:///./postal_db.db")  # Change to PostgreSQL if needed.
+
+# Postal directory CSV
+POSTAL_CSV = os.environ.get("POSTAL_CSV", "coimbature_df (1).csv")
+INGEST_CHUNK_SIZE = 5000
+
+# CSV column -> record field
+CSV_COLUMNS = {
+    "CircleName": "circle",
+    "RegionName": "region",
+    "DivisionName": "division",
+    "OfficeName": "post_office",
+    "Pincode": "pincode",
+    "OfficeType": "office_type",
+    "Delivery": "delivery",
+    "District": "district",
+    "StateName": "state",
+    "Latitude": "latitude",
+    "Longitude": "longitude",
+}
+
+# Async driver used by the API for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+ASYNC_POOL_SIZE = int(os.environ.get("POSTAL_DB_POOL_SIZE", "10"))
+
+
+def async_database_url(url: str):
+    """Map a sync database URL to its async-driver equivalent."""
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+# Initialize Database (sync engine for CLI ingestion and scripts)
+engine = create_engine(DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base = declarative_base()
+
+# Async engine and pooled sessions for the API
+if DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(async_database_url(DATABASE_URL))
+else:
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), pool_size=ASYNC_POOL_SIZE,
+                                       max_overflow=ASYNC_POOL_SIZE, pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+async def get_session():
+    """FastAPI dependency yielding a pooled async session."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+# -------------------------------
+# Database Models
+# -------------------------------
+
+class Circle(Base):
+    __tablename__ = 'circles'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class District(Base):
+    __tablename__ = 'districts'
+    __table_args__ = (UniqueConstraint('name', 'state', name='uq_district_state'),)
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    state = Column(String, nullable=False)
+
+
+class Pincode(Base):
+    __tablename__ = 'pincodes'
+    pincode = Column(String(6), primary_key=True)
+    circle_id = Column(Integer, ForeignKey('circles.id'), nullable=True)
+    district_id = Column(Integer, ForeignKey('districts.id'), nullable=True)
+
+    circle = relationship(Circle)
+    district = relationship(District)
+    offices = relationship("PostOffice", back_populates="pincode_row")
+
+
+class PostOffice(Base):
+    __tablename__ = 'post_offices'
+    __table_args__ = (
+        # One row per office name within a pincode; also serves pincode -> offices lookups
+        UniqueConstraint('pincode', 'name', name='uq_office_pincode_name'),
+        # Office name -> pincode reverse lookup for OCR validation (covering index)
+        Index('ix_office_name_key_pincode', 'name_key', 'pincode'),
+        Index('ix_office_district_pincode', 'district_id', 'pincode'),
+    )
+    id = Column(Integer, primary_key=True)
+    pincode = Column(String(6), ForeignKey('pincodes.pincode'), nullable=False)
+    name = Column(String, nullable=False)
+    name_key = Column(String, nullable=False)
+    office_type = Column(String, nullable=True)
+    delivery = Column(String, nullable=False)
+    division = Column(String, nullable=True)
+    region = Column(String, nullable=True)
+    district_id = Column(Integer, ForeignKey('districts.id'), nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+
+    pincode_row = relationship(Pincode, back_populates="offices")
+    district = relationship(District)
+
+
+class DirectoryVersion(Base):
+    """Single-row counter bumped by every directory write, so API workers can tell their index is stale."""
+    __tablename__ = 'directory_version'
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+
+
+def create_tables():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _insert_ignoring_existing(conn, DirectoryVersion.__table__, [{"id": 1, "version": 0}], ["id"])
+
+# -------------------------------
+# Queries
+# -------------------------------
+
+def _office_query():
+    """Offices joined with their district and circle, shaped like postal_index.Office."""
+    return (
+        select(
+            PostOffice.pincode,
+            PostOffice.name.label("post_office"),
+            PostOffice.delivery,
+            District.name.label("district"),
+            District.state,
+            PostOffice.latitude,
+            PostOffice.longitude,
+            PostOffice.office_type,
+            PostOffice.division,
+            PostOffice.region,
+            Circle.name.label("circle"),
+        )
+        .join(District, PostOffice.district_id == District.id)
+        .join(Pincode, PostOffice.pincode == Pincode.pincode)
+        .outerjoin(Circle, Pincode.circle_id == Circle.id)
+    )
+
+
+def all_offices(db_session):
+    """Every office in the directory, for building the in-memory index.
+
+    Ordered like offices_for_pincode, so a pincode's offices keep their order when one is updated.
+    """
+    query = _office_query().order_by(PostOffice.pincode, PostOffice.name)
+    return [Office(*row) for row in db_session.execute(query)]
+
+
+def offices_for_pincode(db_session, pincode: str):
+    """All offices registered under a pincode, in one indexed query."""
+    query = _office_query().where(PostOffice.pincode == pincode).order_by(PostOffice.name)
+    return [Office(*row) for row in db_session.execute(query)]
+
+
+def directory_version(db_session):
+    """Current directory version; it changes whenever offices are written."""
+    return db_session.execute(select(DirectoryVersion.version).where(DirectoryVersion.id == 1)).scalar_one_or_none()
+
+
+def pincodes_for_office(db_session, office_name: str):
+    """Reverse lookup: pincodes of offices whose normalized name matches."""
+    query = select(PostOffice.pincode).where(PostOffice.name_key == office_key(office_name)).distinct()
+    return list(db_session.execute(query).scalars())
+
+# -------------------------------
+# Writes
+# -------------------------------
+
+def _bump_directory_version(db_session):
+    # A single UPDATE, so concurrent writers from several processes never lose an increment
+    db_session.execute(update(DirectoryVersion).where(DirectoryVersion.id == 1)
+                       .values(version=DirectoryVersion.version + 1))
+
+
+def _get_or_create(db_session, model, **fields):
+    row = db_session.execute(select(model).filter_by(**fields)).scalar_one_or_none()
+    if row is None:
+        row = model(**fields)
+        db_session.add(row)
+        db_session.flush()
+    return row
+
+
+def upsert_office(db_session, office: Office):
+    """Add or update a single office (keyed by pincode and office name)."""
+    district = _get_or_create(db_session, District, name=office.district, state=office.state)
+    pincode = db_session.get(Pincode, office.pincode)
+    if pincode is None:
+        circle = _get_or_create(db_session, Circle, name=office.circle) if office.circle else None
+        pincode = Pincode(pincode=office.pincode, district_id=district.id,
+                          circle_id=circle.id if circle else None)
+        db_session.add(pincode)
+    entry = db_session.execute(
+        select(PostOffice).where(PostOffice.pincode == office.pincode, PostOffice.name == office.post_office)
+    ).scalar_one_or_none()
+    if entry is None:
+        entry = PostOffice(pincode=office.pincode, name=office.post_office)
+        db_session.add(entry)
+    entry.name_key = office_key(office.post_office)
+    entry.delivery = office.delivery
+    entry.district_id = district.id
+    entry.latitude = office.latitude
+    entry.longitude = office.longitude
+    if office.office_type is not None:
+        entry.office_type = office.office_type
+    if office.division is not None:
+        entry.division = office.division
+    if office.region is not None:
+        entry.region = office.region
+    _bump_directory_version(db_session)
+    db_session.commit()
+    return entry
+
+# -------------------------------
+# Bulk CSV Ingestion
+# -------------------------------
+
+def read_postal_csv(csv_path: str):
+    """Load the postal directory CSV into a DataFrame with record field names."""
+    import pandas as pd
+
+    data = pd.read_csv(csv_path, usecols=list(CSV_COLUMNS), dtype={"Pincode": str})
+    data = data.rename(columns=CSV_COLUMNS)
+    # The all-India directory uses "NA" for offices without coordinates
+    data["latitude"] = pd.to_numeric(data["latitude"], errors="coerce")
+    data["longitude"] = pd.to_numeric(data["longitude"], errors="coerce")
+    data["name_key"] = data["post_office"].map(office_key)
+    return data.drop_duplicates(["pincode", "post_office"])
+
+
+def _records(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def _insert_ignoring_existing(conn, table, records, key_columns):
+    """Insert records, skipping rows whose key already exists. Returns the number inserted."""
+    if not records:
+        return 0
+    if conn.dialect.name in ("sqlite", "postgresql"):
+        if conn.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).on_conflict_do_nothing(index_elements=key_columns)
+        result = conn.execute(stmt, records)
+        return result.rowcount if result.rowcount >= 0 else len(records)
+    # Other backends: one set-based existence check per chunk
+    keys = [tuple(record[column] for column in key_columns) for record in records]
+    columns = [table.c[column] for column in key_columns]
+    query = select(*columns).where(columns[0].in_({key[0] for key in keys}))
+    existing = {tuple(row) for row in conn.execute(query)}
+    fresh = [record for record, key in zip(records, keys) if key not in existing]
+    if fresh:
+        conn.execute(table.insert(), fresh)
+    return len(fresh)
+
+
+def _id_map(conn, table, key_columns, wanted):
+    """Ensure every key tuple in wanted exists in a lookup table and return key -> id."""
+    records = [dict(zip(key_columns, key)) for key in wanted]
+    _insert_ignoring_existing(conn, table, records, key_columns)
+    rows = conn.execute(select(table.c.id, *(table.c[column] for column in key_columns)))
+    return {tuple(row)[1:]: row[0] for row in rows}
+
+
+def populate_database_from_csv(csv_path: str = POSTAL_CSV, chunk_size: int = INGEST_CHUNK_SIZE):
+    """Populate the database with postal data from the given CSV.
+
+    Circles and districts are resolved to ids with one set-based pass, then
+    pincodes and offices are inserted in chunks with a single executemany per
+    chunk. Rows already present are left untouched, so the ingest can be
+    re-run safely.
+    """
+    start = time.perf_counter()
+    data = read_postal_csv(csv_path)
+    inserted = 0
+    with engine.begin() as conn:
+        circle_ids = _id_map(conn, Circle.__table__, ["name"],
+                             {(name,) for name in data["circle"].dropna().unique()})
+        district_ids = _id_map(conn, District.__table__, ["name", "state"],
+                               set(data[["district", "state"]].itertuples(index=False, name=None)))
+        data["circle_id"] = data["circle"].map(lambda name: circle_ids.get((name,)))
+        data["district_id"] = [district_ids[key] for key in zip(data["district"], data["state"])]
+
+        pincodes = data.drop_duplicates("pincode")[["pincode", "circle_id", "district_id"]]
+        for offset in range(0, len(pincodes), chunk_size):
+            _insert_ignoring_existing(conn, Pincode.__table__, _records(pincodes.iloc[offset:offset + chunk_size]),
+                                      ["pincode"])
+
+        offices = data.rename(columns={"post_office": "name"})[
+            ["pincode", "name", "name_key", "office_type", "delivery", "division", "region",
+             "district_id", "latitude", "longitude"]
+        ]
+        for offset in range(0, len(offices), chunk_size):
+            inserted += _insert_ignoring_existing(conn, PostOffice.__table__,
+                                                  _records(offices.iloc[offset:offset + chunk_size]),
+                                                  ["pincode", "name"])
+            done = min(offset + chunk_size, len(offices))
+            elapsed = time.perf_counter() - start
+            print(f"Ingested {done}/{len(offices)} offices ({done / elapsed:.0f} rows/s).")
+        if inserted:
+            _bump_directory_version(conn)
+    elapsed = time.perf_counter() - start
+    print(f"Database populated from CSV: {inserted} new offices, {len(data) - inserted} already present, "
+          f"{len(pincodes)} pincodes, {elapsed:.2f}s ({len(data) / max(elapsed, 1e-9):.0f} rows/s).")
+    return inserted
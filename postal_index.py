@@ -0,0 +1,285 @@
+# Filename: postal_index.py
+
+import bisect
+import csv
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+# -------------------------------
+# Immutable Pincode Index
+# -------------------------------
+
+# Office-type suffixes dropped when matching office names ("Belladi BO" -> "belladi")
+_OFFICE_SUFFIX = re.compile(r"\s+(?:b\.?o|s\.?o|h\.?o|p\.?o|g\.?p\.?o)\.?$", re.IGNORECASE)
+
+# CSV OfficeType -> API BranchType
+OFFICE_TYPES = {
+    "BO": "Branch Post Office",
+    "PO": "Sub Post Office",
+    "SO": "Sub Post Office",
+    "HO": "Head Post Office",
+}
+
+def office_key(name):
+    """Normalize an office name for reverse lookups."""
+    key = " ".join(re.sub(r"[^a-z0-9. ]", " ", (name or "").lower()).split())
+    return _OFFICE_SUFFIX.sub("", key)
+
+
+class Office(NamedTuple):
+    pincode: str
+    post_office: str
+    delivery: str
+    district: str
+    state: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    office_type: Optional[str] = None
+    division: Optional[str] = None
+    region: Optional[str] = None
+    circle: Optional[str] = None
+
+    def as_dict(self):
+        return self._asdict()
+
+    def as_api_record(self):
+        """Shape the office like a PostOffice entry from api.postalpincode.in."""
+        return {
+            "Name": _OFFICE_SUFFIX.sub("", self.post_office or ""),
+            "Description": None,
+            "BranchType": OFFICE_TYPES.get(self.office_type, self.office_type),
+            "DeliveryStatus": self.delivery,
+            "Circle": self.circle,
+            "District": self.district.title() if self.district else self.district,
+            "Division": self.division,
+            "Region": self.region,
+            "Block": None,
+            "State": self.state.title() if self.state else self.state,
+            "Country": "India",
+            "Pincode": self.pincode,
+        }
+
+
+def api_response_for(offices):
+    """Body api.postalpincode.in returns for a pincode with these offices."""
+    if not offices:
+        return [{"Message": "No records found", "Status": "Error", "PostOffice": None}]
+    return [{
+        "Message": f"Number of pincode(s) found:{len(offices)}",
+        "Status": "Success",
+        "PostOffice": [office.as_api_record() for office in offices],
+    }]
+
+
+class PostalIndex:
+    """Read-only pincode -> offices index backed by a single sorted tuple.
+
+    Offices are stored contiguously, sorted by pincode, and a dict maps each
+    pincode to its (start, stop) slice. The index is never mutated in place:
+    writers build a new index and swap the reference, so readers never need a
+    lock or a database session.
+    """
+
+    __slots__ = ("_offices", "_ranges", "_by_name")
+
+    def __init__(self, offices=()):
+        offices = tuple(sorted((Office(*o) if not isinstance(o, Office) else o for o in offices),
+                               key=lambda o: o.pincode))
+        ranges = {}
+        start = 0
+        for i in range(1, len(offices) + 1):
+            if i == len(offices) or offices[i].pincode != offices[start].pincode:
+                ranges[offices[start].pincode] = (start, i)
+                start = i
+        by_name = {}
+        for office in offices:
+            pincodes = by_name.setdefault(office_key(office.post_office), [])
+            if office.pincode not in pincodes:
+                pincodes.append(office.pincode)
+        self._offices = offices
+        self._ranges = ranges
+        self._by_name = {key: tuple(pincodes) for key, pincodes in by_name.items()}
+
+    @classmethod
+    def _from_parts(cls, offices, ranges, by_name):
+        index = cls.__new__(cls)
+        index._offices = offices
+        index._ranges = ranges
+        index._by_name = by_name
+        return index
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build an index from ORM rows or any objects exposing the Office fields."""
+        return cls(Office(*(getattr(row, field, None) for field in Office._fields)) for row in rows)
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        """Build an index straight from a postal directory CSV (no database or pandas needed)."""
+        def coordinate(value):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            return cls(
+                Office(
+                    pincode=row["Pincode"].strip(),
+                    post_office=row["OfficeName"],
+                    delivery=row["Delivery"],
+                    district=row["District"],
+                    state=row["StateName"],
+                    latitude=coordinate(row.get("Latitude")),
+                    longitude=coordinate(row.get("Longitude")),
+                    office_type=row.get("OfficeType"),
+                    division=row.get("DivisionName"),
+                    region=row.get("RegionName"),
+                    circle=row.get("CircleName"),
+                )
+                for row in csv.DictReader(f)
+            )
+
+    def lookup(self, pincode):
+        """Return every office registered under the pincode (empty tuple if unknown)."""
+        span = self._ranges.get(pincode)
+        if span is None:
+            return ()
+        return self._offices[span[0]:span[1]]
+
+    def first(self, pincode):
+        span = self._ranges.get(pincode)
+        return self._offices[span[0]] if span else None
+
+    def api_response(self, pincode):
+        """Body api.postalpincode.in would return for the pincode, built from this index."""
+        return api_response_for(self.lookup(pincode))
+
+    def pincodes_for_office(self, name):
+        """Reverse lookup: pincodes of every office whose normalized name matches."""
+        return self._by_name.get(office_key(name), ())
+
+    def __contains__(self, pincode):
+        return pincode in self._ranges
+
+    def __len__(self):
+        return len(self._offices)
+
+    def pincodes(self):
+        return self._ranges.keys()
+
+    def with_pincode(self, pincode, offices):
+        """Return a new index with every office under the pincode replaced by the given ones.
+
+        The new index is spliced from this one instead of re-sorted: the
+        office tuple is copied around the pincode's slice, later ranges are
+        shifted and only the replaced offices' names are re-keyed.
+        """
+        offices = tuple(Office(*o) if not isinstance(o, Office) else o for o in offices)
+        span = self._ranges.get(pincode)
+        if span is None:
+            start = stop = bisect.bisect_left(self._offices, pincode, key=lambda office: office.pincode)
+        else:
+            start, stop = span
+        shift = len(offices) - (stop - start)
+        ranges = {key: (a + shift, b + shift) if a >= stop else (a, b)
+                  for key, (a, b) in self._ranges.items() if key != pincode}
+        if offices:
+            ranges[pincode] = (start, start + len(offices))
+
+        by_name = dict(self._by_name)
+        for office in self._offices[start:stop]:
+            key = office_key(office.post_office)
+            remaining = tuple(p for p in by_name.get(key, ()) if p != pincode)
+            if remaining:
+                by_name[key] = remaining
+            else:
+                by_name.pop(key, None)
+        for office in offices:
+            key = office_key(office.post_office)
+            if pincode not in by_name.get(key, ()):
+                by_name[key] = by_name.get(key, ()) + (pincode,)
+        return PostalIndex._from_parts(self._offices[:start] + offices + self._offices[stop:], ranges, by_name)
+
+
+class IndexHolder:
+    """Holds the current PostalIndex and swaps it atomically on write."""
+
+    def __init__(self, index=None):
+        self._index = index if index is not None else PostalIndex()
+        self._write_lock = threading.Lock()
+
+    @property
+    def current(self):
+        return self._index
+
+    def replace(self, index):
+        with self._write_lock:
+            self._index = index
+
+    def update(self, fn):
+        """Apply fn(old_index) -> new_index under the writer lock and publish the result."""
+        with self._write_lock:
+            self._index = fn(self._index)
+            return self._index
+
+# -------------------------------
+# Latency Tracking
+# -------------------------------
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sequence of numbers."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LatencyTracker:
+    """Keeps a bounded window of recent latencies per key and reports p50/p99."""
+
+    def __init__(self, window=10000):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def time(self, key):
+        return _Timer(self, key)
+
+    def summary(self):
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+        return {
+            key: {
+                "count": len(samples),
+                "p50_ms": round(percentile(samples, 50) * 1000, 4),
+                "p99_ms": round(percentile(samples, 99) * 1000, 4),
+            }
+            for key, samples in snapshot.items() if samples
+        }
+
+
+class _Timer:
+    def __init__(self, tracker, key):
+        self.tracker = tracker
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracker.record(self.key, time.perf_counter() - self.start)
+        return False
@@ -0,0 +1,278 @@
+# Filename: postal_snapshot.py
+#
+# Compiles the postal directory into a compact binary snapshot that any
+# process opens with mmap: no CSV parsing at startup, and every worker on a
+# box shares the same page-cache pages instead of holding its own copy.
+#
+#   python postal_snapshot.py build "coimbature_df (1).csv" -o postal_directory.snap
+#   python postal_snapshot.py build db                      # from main.py's database
+#   python postal_snapshot.py info postal_directory.snap
+#
+# Point POSTAL_DIRECTORY at the .snap file to use it in the resolver.
+
+import argparse
+import array
+import bisect
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from collections.abc import Sequence
+
+from postal_index import Office, office_key, api_response_for
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+SNAPSHOT_PATH = os.environ.get("POSTAL_SNAPSHOT", "postal_directory.snap")
+SNAPSHOT_SUFFIX = ".snap"
+
+MAGIC = b"PINSNAP\0"
+VERSION = 1
+
+# Written in the header; a mismatch means the file was built on a host of the other byte order
+BYTE_ORDER_MARK = 0x01020304
+
+# magic, version, byte order mark, offices, distinct pincodes, interned strings, string bytes
+HEADER = struct.Struct("<8sIIIIII")
+
+# Office text fields stored as ids into the interned string table
+TEXT_FIELDS = ("post_office", "delivery", "district", "state", "office_type", "division", "region", "circle")
+
+# String id standing for None
+NO_STRING = 0xFFFFFFFF
+
+# float32 keeps ~7 significant digits; rounding to 5 decimals (~1 m) drops the float32 noise
+COORDINATE_DECIMALS = 5
+
+_ALIGNMENT = 8
+
+# -------------------------------
+# Building
+# -------------------------------
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+
+
+def _write_array(f, typecode, values):
+    column = array.array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    f.write(column.tobytes())
+    _pad(f)
+
+
+def write_snapshot(index, path=SNAPSHOT_PATH):
+    """Write a PostalIndex to a snapshot file; returns the number of offices written.
+
+    Offices whose pincode is not six digits cannot be integer-encoded and
+    are skipped. The file is written next to `path` and renamed over it, so
+    processes that already mapped the old snapshot keep a consistent view.
+    """
+    offices = []
+    for pincode in sorted(index.pincodes()):
+        if len(pincode) != 6 or not pincode.isdigit():
+            logging.warning(f"Snapshot: skipping invalid pincode {pincode!r}.")
+            continue
+        offices.extend(index.lookup(pincode))
+
+    keys, starts = [], []
+    for i, office in enumerate(offices):
+        if not keys or keys[-1] != int(office.pincode):
+            keys.append(int(office.pincode))
+            starts.append(i)
+    starts.append(len(offices))
+
+    strings = {}
+    columns = {field: [] for field in TEXT_FIELDS}
+    for office in offices:
+        for field in TEXT_FIELDS:
+            value = getattr(office, field)
+            columns[field].append(NO_STRING if value is None else strings.setdefault(value, len(strings)))
+    encoded = [value.encode("utf-8") for value in strings]
+    string_offsets = [0]
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    def coordinate(value):
+        return math.nan if value is None else value
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(offices), len(keys), len(encoded),
+                            string_offsets[-1]))
+        _pad(f)
+        _write_array(f, "I", keys)
+        _write_array(f, "I", starts)
+        _write_array(f, "f", (coordinate(office.latitude) for office in offices))
+        _write_array(f, "f", (coordinate(office.longitude) for office in offices))
+        for field in TEXT_FIELDS:
+            _write_array(f, "I", columns[field])
+        _write_array(f, "I", string_offsets)
+        f.write(b"".join(encoded))
+    os.replace(tmp_path, path)
+    return len(offices)
+
+
+def build_snapshot(source, path=SNAPSHOT_PATH):
+    """Compile a directory CSV (or "db", the postal database) into a snapshot."""
+    from pincode_resolver import load_directory
+
+    return write_snapshot(load_directory(source), path)
+
+# -------------------------------
+# Memory-Mapped Snapshot
+# -------------------------------
+
+class SnapshotPincodes(Sequence):
+    """The snapshot's distinct pincodes as strings, in order, decoded on access."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot.pincode_keys)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [f"{key:06d}" for key in self._snapshot.pincode_keys[i]]
+        return f"{self._snapshot.pincode_keys[i]:06d}"
+
+    def __contains__(self, pincode):
+        return pincode in self._snapshot
+
+
+class PostalSnapshot:
+    """Read-only PostalIndex over a memory-mapped snapshot file.
+
+    Columns are memoryviews straight onto the mapping, so opening costs a
+    header read and nothing is copied: the OS pages the file in on demand
+    and shares those pages between every process mapping it. Lookups
+    bisect the sorted pincode keys and decode only the matching offices.
+    It answers the PostalIndex read methods (lookup, first, api_response,
+    pincodes, pincodes_for_office), so it can back a PincodeResolver.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, version, mark, offices, pincodes, strings, string_bytes = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} postal snapshot.")
+        if mark != BYTE_ORDER_MARK or sys.byteorder != "little":
+            raise ValueError(f"{path} was built for a different byte order; rebuild it on this host.")
+
+        position = HEADER.size + (-HEADER.size % _ALIGNMENT)
+
+        def section(typecode, count):
+            nonlocal position
+            size = count * (1 if typecode == "B" else 4)
+            view = buffer[position:position + size]
+            position += size + (-size % _ALIGNMENT)
+            return view if typecode == "B" else view.cast(typecode)
+
+        self.pincode_keys = section("I", pincodes)
+        self._starts = section("I", pincodes + 1)
+        self.latitudes = section("f", offices)
+        self.longitudes = section("f", offices)
+        self._text = {field: section("I", offices) for field in TEXT_FIELDS}
+        self._string_offsets = section("I", strings + 1)
+        self._string_data = section("B", string_bytes)
+        self._by_name = None
+
+    def _string(self, string_id):
+        if string_id == NO_STRING:
+            return None
+        return str(self._string_data[self._string_offsets[string_id]:self._string_offsets[string_id + 1]],
+                   "utf-8")
+
+    def _coordinate(self, column, i):
+        value = column[i]
+        return None if math.isnan(value) else round(value, COORDINATE_DECIMALS)
+
+    def _office(self, i, pincode):
+        return Office(pincode=pincode, latitude=self._coordinate(self.latitudes, i),
+                      longitude=self._coordinate(self.longitudes, i),
+                      **{field: self._string(column[i]) for field, column in self._text.items()})
+
+    def _span(self, pincode):
+        if not isinstance(pincode, str) or len(pincode) != 6 or not pincode.isdigit():
+            return None
+        key = int(pincode)
+        position = bisect.bisect_left(self.pincode_keys, key)
+        if position == len(self.pincode_keys) or self.pincode_keys[position] != key:
+            return None
+        return self._starts[position], self._starts[position + 1]
+
+    def lookup(self, pincode):
+        """Return every office registered under the pincode (empty tuple if unknown)."""
+        span = self._span(pincode)
+        if span is None:
+            return ()
+        return tuple(self._office(i, pincode) for i in range(*span))
+
+    def first(self, pincode):
+        span = self._span(pincode)
+        return self._office(span[0], pincode) if span else None
+
+    def api_response(self, pincode):
+        """Body api.postalpincode.in would return for the pincode, built from this snapshot."""
+        return api_response_for(self.lookup(pincode))
+
+    def pincodes_for_office(self, name):
+        """Reverse lookup: pincodes of every office whose normalized name matches.
+
+        The name map is built on first use, in this process only.
+        """
+        if self._by_name is None:
+            by_name = {}
+            post_offices = self._text["post_office"]
+            for position, pincode in enumerate(self.pincodes()):
+                for i in range(self._starts[position], self._starts[position + 1]):
+                    pincodes = by_name.setdefault(office_key(self._string(post_offices[i])), [])
+                    if pincode not in pincodes:
+                        pincodes.append(pincode)
+            self._by_name = {key: tuple(pincodes) for key, pincodes in by_name.items()}
+        return self._by_name.get(office_key(name), ())
+
+    def __contains__(self, pincode):
+        return self._span(pincode) is not None
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    def pincodes(self):
+        return SnapshotPincodes(self)
+
+    def info(self):
+        return {"path": self.path, "bytes": len(self._mmap), "offices": len(self),
+                "pincodes": len(self.pincode_keys), "strings": len(self._string_offsets) - 1}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Build or inspect postal directory snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Compile a directory CSV (or 'db') into a snapshot.")
+    build_parser.add_argument("source", nargs="?", default=os.environ.get("POSTAL_CSV", "coimbature_df (1).csv"))
+    build_parser.add_argument("-o", "--output", default=SNAPSHOT_PATH)
+    info_parser = commands.add_parser("info", help="Describe a snapshot and time opening it.")
+    info_parser.add_argument("path", nargs="?", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_snapshot(args.source, args.output)
+        logging.info(f"Wrote {count} offices to {args.output} ({os.path.getsize(args.output)} bytes) "
+                     f"in {time.perf_counter() - start:.2f}s.")
+    else:
+        start = time.perf_counter()
+        snapshot = PostalSnapshot(args.path)
+        logging.info(f"Opened in {(time.perf_counter() - start) * 1000:.2f} ms: {snapshot.info()}")
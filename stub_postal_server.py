@@ -0,0 +1,75 @@
+# Filename: stub_postal_server.py
+#
+# Local stand-in for api.postalpincode.in, answering from the postal CSV.
+# Use it to exercise pincode_client without the network:
+#
+#   python stub_postal_server.py --port 8081
+#   POSTAL_API_ENDPOINT=http://127.0.0.1:8081/pincode/ python pincode_finder_2.py
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from postal_index import PostalIndex
+
+DEFAULT_CSV = "coimbature_df (1).csv"
+
+
+def make_handler(index, delay=0.0, fail_every=0):
+    """Request handler serving /pincode/<pincode>, optionally slow or intermittently failing."""
+    counter = {"requests": 0}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+        disable_nagle_algorithm = True  # headers and body go out as separate writes; don't stall on delayed ACKs
+
+        def do_GET(self):
+            with lock:
+                counter["requests"] += 1
+                request_number = counter["requests"]
+            if delay:
+                time.sleep(delay)
+            if fail_every and request_number % fail_every == 0:
+                self._send(503, b"Service Unavailable")
+                return
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] != "pincode":
+                self._send(404, b"Not Found")
+                return
+            self._send(200, json.dumps(index.api_response(parts[1])).encode("utf-8"))
+
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(csv_path=DEFAULT_CSV, host="127.0.0.1", port=0, delay=0.0, fail_every=0):
+    """Start the stub in a background thread. Returns (server, endpoint URL)."""
+    server = ThreadingHTTPServer((host, port), make_handler(PostalIndex.from_csv(csv_path), delay, fail_every))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/pincode/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the postal pincode API.")
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds of latency added per request.")
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth request with HTTP 503.")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port),
+                                 make_handler(PostalIndex.from_csv(args.csv), args.delay, args.fail_every))
+    print(f"Stub postal API listening on http://{args.host}:{args.port}/pincode/")
+    server.serve_forever()
@@ -0,0 +1,116 @@
+# Filename: tiered_parser.py
+
+import logging
+import os
+import threading
+import time
+
+from gazetteer import Gazetteer
+from ner_service import extract_pincode, get_ner_service
+from postal_index import LatencyTracker
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+POSTAL_CSV = os.environ.get("POSTAL_CSV", "coimbature_df (1).csv")
+
+# Log per-tier hit rates and latencies every N parsed addresses
+STATS_LOG_EVERY = int(os.environ.get("PARSER_STATS_LOG_EVERY", "100"))
+
+# -------------------------------
+# Tiered Address Parser
+# -------------------------------
+
+class TieredAddressParser:
+    """Gazetteer fast path in front of the transformer NER.
+
+    Tier 1 extracts the 6-digit pincode by regex and scans the text against
+    the postal gazetteer. If a place name in the text belongs to that
+    pincode, or the text has no pincode but its office names point to
+    exactly one, the address is resolved without NER. Otherwise tier 2 runs
+    the NER model and its entities are merged with the gazetteer matches.
+    """
+
+    def __init__(self, gazetteer, ner_service=None, stats_log_every=STATS_LOG_EVERY):
+        self.gazetteer = gazetteer
+        self.ner_service = ner_service if ner_service is not None else get_ner_service()
+        self.stats_log_every = stats_log_every
+        self.latency = LatencyTracker(window=5000)
+        self._lock = threading.Lock()
+        self.counters = {"gazetteer": 0, "ner": 0}
+
+    def _resolve_cheaply(self, address):
+        """Tier 1. Returns (parsed, pincode, resolved)."""
+        pincode = extract_pincode(address)
+        matches = self.gazetteer.find(address)
+        parsed = {}
+        for match in matches:
+            parsed.setdefault(match.kind.upper(), []).append(match.name)
+
+        if pincode:
+            resolved = any(pincode in match.pincodes for match in matches)
+        else:
+            candidates = set()
+            for match in matches:
+                if match.kind == "office":
+                    candidates |= match.pincodes
+            resolved = len(candidates) == 1
+            if resolved:
+                pincode = next(iter(candidates))
+        return parsed, pincode, resolved
+
+    def parse(self, address):
+        """Parse the given address and detect its PIN code. Returns (parsed components, pincode)."""
+        start = time.perf_counter()
+        parsed, pincode, resolved = self._resolve_cheaply(address)
+        tier = "gazetteer"
+        if not resolved:
+            tier = "ner"
+            entities, ner_pincode = self.ner_service.parse_address(address)
+            for entity_type, words in entities.items():
+                parsed.setdefault(entity_type, []).extend(words)
+            pincode = pincode or ner_pincode
+        self.latency.record(tier, time.perf_counter() - start)
+        self._count(tier)
+        return parsed, pincode
+
+    def _count(self, tier):
+        with self._lock:
+            self.counters[tier] += 1
+            total = sum(self.counters.values())
+        if self.stats_log_every and total % self.stats_log_every == 0:
+            logging.info(f"Address parser tiers: {self.stats()}")
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        total = sum(counters.values())
+        latency = self.latency.summary()
+        return {
+            tier: {
+                "count": count,
+                "hit_rate": round(count / total, 4) if total else None,
+                "p50_ms": latency.get(tier, {}).get("p50_ms"),
+                "p99_ms": latency.get(tier, {}).get("p99_ms"),
+            }
+            for tier, count in counters.items()
+        }
+
+
+_parser = None
+_parser_lock = threading.Lock()
+
+def get_tiered_parser(ner_service=None):
+    """Process-wide TieredAddressParser over the postal CSV gazetteer."""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                try:
+                    gazetteer = Gazetteer.from_csv(POSTAL_CSV)
+                except (OSError, KeyError) as e:
+                    logging.error(f"Could not build the gazetteer ({e}); every address will use NER.")
+                    gazetteer = Gazetteer()
+                _parser = TieredAddressParser(gazetteer, ner_service)
+    return _parser
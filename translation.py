@@ -0,0 +1,327 @@
+# Filename: translation.py
+
+import csv
+import importlib.util
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+# -------------------------------
+# Configuration and Setup
+# -------------------------------
+
+# SQLite file keeping remote phrase translations across restarts ("" keeps them in memory only)
+TRANSLATION_CACHE_DB = os.environ.get("TRANSLATION_CACHE_DB", os.path.join("cache", "translation_cache.db"))
+
+# Never call the remote translator (defaults to POSTAL_OFFLINE, for stations without connectivity)
+TRANSLATION_OFFLINE = os.environ.get("TRANSLATION_OFFLINE", os.environ.get("POSTAL_OFFLINE", "0")) == "1"
+
+# Offline backends tried in order when the remote translator is off or fails
+OFFLINE_BACKENDS = os.environ.get("TRANSLATION_OFFLINE_BACKENDS", "places,tamil,sanscript").split(",")
+
+# CSV of known place names (columns: native,english) for the "places" backend
+PLACE_NAMES_CSV = os.environ.get("TRANSLATION_PLACE_NAMES", "place_names.csv")
+
+# Unicode blocks of the Indic scripts seen on Indian mail
+SCRIPT_RANGES = {
+    "devanagari": ("\u0900", "\u097F"),
+    "bengali": ("\u0980", "\u09FF"),
+    "gurmukhi": ("\u0A00", "\u0A7F"),
+    "gujarati": ("\u0A80", "\u0AFF"),
+    "oriya": ("\u0B00", "\u0B7F"),
+    "tamil": ("\u0B80", "\u0BFF"),
+    "telugu": ("\u0C00", "\u0C7F"),
+    "kannada": ("\u0C80", "\u0CFF"),
+    "malayalam": ("\u0D00", "\u0D7F"),
+}
+SCRIPT_PATTERNS = {script: re.compile(f"[{start}-{end}]") for script, (start, end) in SCRIPT_RANGES.items()}
+_INDIC_CLASS = "".join(f"{start}-{end}" for start, end in SCRIPT_RANGES.values())
+INDIC_CHARACTERS = re.compile(f"[{_INDIC_CLASS}]")
+
+# A run of Indic words (with the spaces between them): the unit that is translated and cached
+INDIC_PHRASE = re.compile(f"[{_INDIC_CLASS}]+(?:\\s+[{_INDIC_CLASS}]+)*")
+
+# -------------------------------
+# Script Detection
+# -------------------------------
+
+def detect_scripts(text):
+    """Count characters per Indic script, e.g. {"tamil": 12}."""
+    counts = {}
+    for script, pattern in SCRIPT_PATTERNS.items():
+        count = len(pattern.findall(text))
+        if count:
+            counts[script] = count
+    return counts
+
+
+def dominant_script(text):
+    """The Indic script with most characters in text, or "latin" if there is none."""
+    counts = detect_scripts(text)
+    return max(counts, key=counts.get) if counts else "latin"
+
+
+def needs_translation(text):
+    return INDIC_CHARACTERS.search(text) is not None
+
+
+def normalize_digits(text):
+    """Replace Indic digits (e.g. Tamil ௬௪௧) with ASCII digits, so PIN codes survive any path."""
+    if text.isascii():
+        return text
+    return "".join(str(unicodedata.decimal(char)) if char.isdecimal() and not char.isascii() else char
+                   for char in text)
+
+# -------------------------------
+# Offline Backends
+# -------------------------------
+
+class OfflineBackend:
+    """translate(phrase, script) -> English/Latin text, or None if this backend cannot handle it."""
+
+    name = "base"
+
+    def is_available(self):
+        return True
+
+    def translate(self, phrase, script):
+        raise NotImplementedError
+
+
+class PlaceNameBackend(OfflineBackend):
+    """Exact lookups of known place names, whole phrase first, then word by word."""
+
+    name = "places"
+
+    def __init__(self, names=None):
+        self.names = dict(names or {})
+
+    @classmethod
+    def from_csv(cls, path=PLACE_NAMES_CSV):
+        names = {}
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    names[row["native"].strip()] = row["english"].strip()
+        return cls(names)
+
+    def is_available(self):
+        return bool(self.names)
+
+    def translate(self, phrase, script):
+        if phrase in self.names:
+            return self.names[phrase]
+        words = phrase.split()
+        if all(word in self.names for word in words):
+            return " ".join(self.names[word] for word in words)
+        return None
+
+
+TAMIL_VOWELS = {"அ": "a", "ஆ": "aa", "இ": "i", "ஈ": "ee", "உ": "u", "ஊ": "oo", "எ": "e", "ஏ": "e",
+                "ஐ": "ai", "ஒ": "o", "ஓ": "o", "ஔ": "au", "ஃ": "h"}
+TAMIL_CONSONANTS = {"க": "k", "ங": "ng", "ச": "s", "ஞ": "nj", "ட": "d", "ண": "n", "த": "th", "ந": "n",
+                    "ப": "p", "ம": "m", "ய": "y", "ர": "r", "ல": "l", "வ": "v", "ழ": "zh", "ள": "l",
+                    "ற": "r", "ன": "n", "ஜ": "j", "ஷ": "sh", "ஸ": "s", "ஹ": "h", "ஶ": "sh"}
+TAMIL_VOWEL_SIGNS = {"ா": "a", "ி": "i", "ீ": "ee", "ு": "u", "ூ": "oo", "ெ": "e", "ே": "e", "ை": "ai",
+                     "ொ": "o", "ோ": "o", "ௌ": "au"}
+TAMIL_VIRAMA = "்"
+
+# Geminates written the way Tamil place names are usually spelt in English
+TAMIL_CLUSTERS = (("thth", "tt"), ("ss", "ch"), ("dd", "tt"), ("rr", "tr"))
+
+
+class TamilTransliterator(OfflineBackend):
+    """Rule-based Tamil -> Latin transliteration in everyday English spelling (Pollachi, Tiruppur)."""
+
+    name = "tamil"
+
+    def transliterate(self, text):
+        out = []
+        for i, char in enumerate(text):
+            following = text[i + 1] if i + 1 < len(text) else ""
+            if char in TAMIL_CONSONANTS:
+                out.append(TAMIL_CONSONANTS[char])
+                if following not in TAMIL_VOWEL_SIGNS and following != TAMIL_VIRAMA:
+                    out.append("a")
+            elif char in TAMIL_VOWEL_SIGNS:
+                out.append(TAMIL_VOWEL_SIGNS[char])
+            elif char in TAMIL_VOWELS:
+                out.append(TAMIL_VOWELS[char])
+            elif char != TAMIL_VIRAMA:
+                out.append(char)
+        word = "".join(out)
+        for cluster, spelling in TAMIL_CLUSTERS:
+            word = word.replace(cluster, spelling)
+        return word
+
+    def translate(self, phrase, script):
+        if script != "tamil":
+            return None
+        return " ".join(self.transliterate(word).capitalize() for word in phrase.split())
+
+
+class SanscriptTransliterator(OfflineBackend):
+    """Any supported Indic script -> ITRANS via the optional indic_transliteration package."""
+
+    name = "sanscript"
+
+    def is_available(self):
+        return importlib.util.find_spec("indic_transliteration") is not None
+
+    def translate(self, phrase, script):
+        from indic_transliteration import sanscript
+
+        scheme = getattr(sanscript, script.upper(), None)
+        if scheme is None:
+            return None
+        latin = sanscript.transliterate(phrase, scheme, sanscript.ITRANS)
+        return " ".join(word.lower().capitalize() for word in latin.split())
+
+
+OFFLINE_BACKEND_TYPES = {
+    "places": PlaceNameBackend.from_csv,
+    "tamil": TamilTransliterator,
+    "sanscript": SanscriptTransliterator,
+}
+
+
+def create_offline_backends(names=OFFLINE_BACKENDS):
+    backends = []
+    for name in names:
+        name = name.strip()
+        if name not in OFFLINE_BACKEND_TYPES:
+            raise ValueError(f"Unknown offline translation backend {name!r}; "
+                             f"expected one of {sorted(OFFLINE_BACKEND_TYPES)}.")
+        backend = OFFLINE_BACKEND_TYPES[name]()
+        if backend.is_available():
+            backends.append(backend)
+    return backends
+
+# -------------------------------
+# Phrase Cache
+# -------------------------------
+
+class PhraseCache:
+    """Phrase -> translation map, optionally persisted to SQLite."""
+
+    def __init__(self, path=None):
+        self._phrases = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS phrase_translations ("
+                " phrase TEXT PRIMARY KEY, translation TEXT NOT NULL, backend TEXT NOT NULL)"
+            )
+            self._conn.commit()
+            self._phrases.update(self._conn.execute("SELECT phrase, translation FROM phrase_translations"))
+
+    def get(self, phrase):
+        return self._phrases.get(phrase)
+
+    def put(self, phrase, translation, backend):
+        with self._lock:
+            self._phrases[phrase] = translation
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO phrase_translations (phrase, translation, backend) VALUES (?, ?, ?)",
+                    (phrase, translation, backend),
+                )
+                self._conn.commit()
+
+    def __len__(self):
+        return len(self._phrases)
+
+# -------------------------------
+# Address Translator
+# -------------------------------
+
+class AddressTranslator:
+    """Drop-in for GoogleTranslator(source='auto', target='en').translate on OCR text.
+
+    Latin text (with Indic digits normalized) is returned without any call.
+    Otherwise each run of Indic words is translated on its own, so the
+    Latin parts and PIN code are never sent and repeated place names hit
+    the phrase cache: cache, then the remote translator, then the offline
+    backends (when offline, or when the remote call fails). Phrases no
+    backend can handle are left as they are.
+    """
+
+    def __init__(self, remote=None, cache=None, backends=None, offline=TRANSLATION_OFFLINE):
+        self._remote = remote
+        self.cache = cache if cache is not None else PhraseCache()
+        self.backends = backends if backends is not None else create_offline_backends()
+        self.offline = offline
+        self.counters = {"texts": 0, "skipped": 0, "phrases": 0, "cache_hits": 0, "remote": 0,
+                         "remote_errors": 0, "offline": 0, "untranslated": 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    @property
+    def remote(self):
+        if self._remote is None:
+            from deep_translator import GoogleTranslator
+
+            self._remote = GoogleTranslator(source='auto', target='en')
+        return self._remote
+
+    def translate(self, text):
+        self._count("texts")
+        text = normalize_digits(text)
+        if not needs_translation(text):
+            self._count("skipped")
+            return text
+        return INDIC_PHRASE.sub(lambda match: self.translate_phrase(match.group(0)), text)
+
+    def translate_phrase(self, phrase):
+        self._count("phrases")
+        cached = self.cache.get(phrase)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached
+        if not self.offline:
+            try:
+                translation = self.remote.translate(phrase)
+            except Exception as e:
+                self._count("remote_errors")
+                logging.warning(f"Remote translation failed, using offline backends: {e}")
+            else:
+                if translation:
+                    self._count("remote")
+                    self.cache.put(phrase, translation, "remote")
+                    return translation
+        script = dominant_script(phrase)
+        for backend in self.backends:
+            translation = backend.translate(phrase, script)
+            if translation:
+                self._count("offline")
+                return translation
+        self._count("untranslated")
+        return phrase
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self.counters)
+        stats["cached_phrases"] = len(self.cache)
+        return stats
+
+
+_translator = None
+_translator_lock = threading.Lock()
+
+def get_translator():
+    """Process-wide AddressTranslator with the persistent phrase cache, created on first use."""
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                _translator = AddressTranslator(cache=PhraseCache(TRANSLATION_CACHE_DB or None))
+    return _translator